@@ -0,0 +1,291 @@
+from itertools import groupby
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    started REAL,
+    ended REAL,
+    seed INTEGER,
+    num_agents INTEGER,
+    has_human INTEGER,
+    status TEXT,
+    ending TEXT,
+    turns INTEGER,
+    project_total INTEGER,
+    winners TEXT
+);
+CREATE TABLE IF NOT EXISTS game_agents (
+    game_id TEXT NOT NULL,
+    persona TEXT NOT NULL,
+    seat INTEGER,
+    model TEXT,
+    is_human INTEGER,
+    won INTEGER,
+    resources INTEGER,
+    influence INTEGER,
+    alive INTEGER,
+    PRIMARY KEY (game_id, persona)
+);
+CREATE TABLE IF NOT EXISTS turn_stats (
+    game_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    persona TEXT NOT NULL,
+    resources INTEGER,
+    influence INTEGER,
+    alive INTEGER,
+    project_total INTEGER,
+    PRIMARY KEY (game_id, turn, persona)
+);
+CREATE TABLE IF NOT EXISTS actions (
+    game_id TEXT NOT NULL,
+    turn INTEGER,
+    persona TEXT,
+    action TEXT,
+    target TEXT,
+    result TEXT,
+    explanation TEXT,
+    latency REAL,
+    created REAL,
+    model TEXT
+);
+CREATE TABLE IF NOT EXISTS contributions (
+    game_id TEXT NOT NULL,
+    turn INTEGER,
+    persona TEXT,
+    amount INTEGER,
+    explanation TEXT
+);
+CREATE INDEX IF NOT EXISTS games_ending ON games (ending);
+CREATE INDEX IF NOT EXISTS game_agents_model ON game_agents (model);
+CREATE INDEX IF NOT EXISTS game_agents_persona ON game_agents (persona);
+CREATE INDEX IF NOT EXISTS actions_game ON actions (game_id, turn);
+CREATE INDEX IF NOT EXISTS contributions_game ON contributions (game_id, turn);
+"""
+
+class GameArchive:
+    """SQLite archive of past games, written in batches by a background thread
+
+    Record calls only enqueue rows, so the game loop never waits on disk. With
+    `in_progress` off, a game's rows are held back until it finishes and
+    games that never finish are not archived.
+    """
+
+    def __init__(self, path="games.db", batch_size=200, flush_seconds=1.0, in_progress=False):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.in_progress = in_progress
+        self._queue = queue.Queue()
+        self._pending = {}  # game_id -> rows held until the game finishes
+        self._pending_lock = threading.Lock()
+        self.written = 0
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Archives created before actions recorded the model that answered
+            if "model" not in {row["name"] for row in conn.execute("PRAGMA table_info(actions)")}:
+                conn.execute("ALTER TABLE actions ADD COLUMN model TEXT")
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---- recording (called from game threads) ----
+
+    def _submit(self, game_id, sql, params):
+        if not self.in_progress:
+            with self._pending_lock:
+                rows = self._pending.get(game_id)
+                if rows is not None:
+                    rows.append((sql, params))
+                    return
+        self._queue.put((sql, params))
+
+    def start_game(self, game_id, seed, num_agents, has_human, agents):
+        """Record a new game; agents is a list of (persona, preferred model, is_human) in seat order"""
+        if not self.in_progress:
+            with self._pending_lock:
+                self._pending[game_id] = []
+        self._submit(
+            game_id,
+            "INSERT OR REPLACE INTO games (id, started, seed, num_agents, has_human, status) VALUES (?, ?, ?, ?, ?, 'running')",
+            (game_id, time.time(), seed, num_agents, int(has_human))
+        )
+        for seat, (persona, model, is_human) in enumerate(agents):
+            self._submit(
+                game_id,
+                "INSERT OR REPLACE INTO game_agents (game_id, persona, seat, model, is_human) VALUES (?, ?, ?, ?, ?)",
+                (game_id, persona, seat, model, int(is_human))
+            )
+
+    def record_action(self, game_id, turn, persona, action, target, result, explanation, latency, model=None):
+        """Record one action; `model` is the one that actually made the decision, which routing may change per call"""
+        self._submit(
+            game_id,
+            "INSERT INTO actions (game_id, turn, persona, action, target, result, explanation, latency, created, model) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (game_id, turn, persona, action, target, result, explanation, latency, time.time(), model)
+        )
+
+    def record_contribution(self, game_id, turn, persona, amount, explanation):
+        self._submit(
+            game_id,
+            "INSERT INTO contributions (game_id, turn, persona, amount, explanation) VALUES (?, ?, ?, ?, ?)",
+            (game_id, turn, persona, amount, explanation)
+        )
+
+    def record_turn(self, game_id, state):
+        """Snapshot every agent's stats at the end of a turn"""
+        for i, persona in enumerate(state.names):
+            self._submit(
+                game_id,
+                "INSERT OR REPLACE INTO turn_stats (game_id, turn, persona, resources, influence, alive, project_total) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (game_id, state.turn, persona, state.resources[i], state.influence[i], state.alive[i], state.project_total)
+            )
+
+    def finish_game(self, game_id, state, ending, winners):
+        """Record the outcome and release any held-back rows to the writer"""
+        self._submit(
+            game_id,
+            "UPDATE games SET ended = ?, status = 'finished', ending = ?, turns = ?, project_total = ?, winners = ? WHERE id = ?",
+            (time.time(), ending, min(state.turn, state.max_turns), state.project_total, json.dumps(winners), game_id)
+        )
+        for i, persona in enumerate(state.names):
+            self._submit(
+                game_id,
+                "UPDATE game_agents SET won = ?, resources = ?, influence = ?, alive = ? WHERE game_id = ? AND persona = ?",
+                (int(persona in winners), state.resources[i], state.influence[i], state.alive[i], game_id, persona)
+            )
+        with self._pending_lock:
+            rows = self._pending.pop(game_id, None)
+        for row in rows or ():
+            self._queue.put(row)
+
+    # ---- background writer ----
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.time())))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    # Consecutive rows for the same statement go in one executemany
+                    for sql, rows in groupby(batch, key=lambda item: item[0]):
+                        conn.executemany(sql, [params for _, params in rows])
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                print(f"✗ Archive write failed, dropped {len(batch)} row(s): {e}")
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until everything queued so far has been written (for scripts and shutdown)"""
+        self._queue.join()
+
+    # ---- history queries ----
+
+    def history(self, limit=50, cursor=None, model=None, persona=None, ending=None, include_running=False):
+        """Page through archived games, newest first; returns (games, next cursor or None)"""
+        clauses, params = [], []
+        if not include_running:
+            clauses.append("g.status = 'finished'")
+        if ending:
+            clauses.append("g.ending = ?")
+            params.append(ending)
+        if model:
+            clauses.append("EXISTS (SELECT 1 FROM game_agents a WHERE a.game_id = g.id AND a.model = ?)")
+            params.append(model)
+        if persona:
+            clauses.append("EXISTS (SELECT 1 FROM game_agents a WHERE a.game_id = g.id AND a.persona = ?)")
+            params.append(persona)
+        if cursor is not None:
+            clauses.append("g.seq < ?")
+            params.append(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connect() as conn:
+            games = [dict(row) for row in conn.execute(
+                f"SELECT * FROM games g {where} ORDER BY g.seq DESC LIMIT ?", params + [limit]
+            )]
+            agents = self._agents_for(conn, [game["id"] for game in games])
+        for game in games:
+            game["winners"] = json.loads(game["winners"]) if game["winners"] else []
+            game["agents"] = agents.get(game["id"], [])
+        next_cursor = games[-1]["seq"] if len(games) == limit else None
+        return games, next_cursor
+
+    def _agents_for(self, conn, game_ids):
+        agents = {}
+        if game_ids:
+            placeholders = ", ".join("?" for _ in game_ids)
+            for row in conn.execute(
+                f"SELECT * FROM game_agents WHERE game_id IN ({placeholders}) ORDER BY seat", game_ids
+            ):
+                agent = dict(row)
+                agents.setdefault(agent.pop("game_id"), []).append(agent)
+        return agents
+
+    def game(self, game_id):
+        """Full record of one game, or None if it is not archived"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM games WHERE id = ?", (game_id,)).fetchone()
+            if row is None:
+                return None
+            game = dict(row)
+            game["winners"] = json.loads(game["winners"]) if game["winners"] else []
+            game["agents"] = self._agents_for(conn, [game_id]).get(game_id, [])
+            for table, order in (("turn_stats", "turn, persona"), ("actions", "rowid"), ("contributions", "rowid")):
+                game[table] = [
+                    {key: row[key] for key in row.keys() if key != "game_id"}
+                    for row in conn.execute(f"SELECT * FROM {table} WHERE game_id = ? ORDER BY {order}", (game_id,))
+                ]
+        return game
+
+    def model_stats(self):
+        """Per-model games, win rate and average decision latency across the archive
+
+        Latency is credited to the model that answered each call. A game goes
+        to the model that made most of that agent's decisions, so routed calls
+        count for the model they were routed to. Rows from before actions
+        recorded a model fall back to the agent's preferred model.
+        """
+        with self._connect() as conn:
+            stats = {
+                row["model"]: {"games": row["games"], "wins": row["wins"], "win_rate": row["wins"] / row["games"]}
+                for row in conn.execute(
+                    "WITH main AS ("
+                    " SELECT game_id, persona, model FROM ("
+                    "  SELECT game_id, persona, model,"
+                    "   ROW_NUMBER() OVER (PARTITION BY game_id, persona ORDER BY COUNT(*) DESC, model) AS rank"
+                    "  FROM actions WHERE model IS NOT NULL GROUP BY game_id, persona, model"
+                    " ) WHERE rank = 1"
+                    ") "
+                    "SELECT COALESCE(m.model, a.model) AS model, COUNT(*) AS games, COALESCE(SUM(a.won), 0) AS wins "
+                    "FROM game_agents a JOIN games g ON g.id = a.game_id "
+                    "LEFT JOIN main m ON m.game_id = a.game_id AND m.persona = a.persona "
+                    "WHERE g.status = 'finished' AND a.is_human = 0 GROUP BY COALESCE(m.model, a.model)"
+                )
+            }
+            for row in conn.execute(
+                "SELECT COALESCE(x.model, a.model) AS model, AVG(x.latency) AS avg_latency, COUNT(x.latency) AS calls FROM actions x "
+                "JOIN game_agents a ON a.game_id = x.game_id AND a.persona = x.persona "
+                "WHERE x.latency IS NOT NULL GROUP BY COALESCE(x.model, a.model)"
+            ):
+                stats.setdefault(row["model"], {}).update(avg_latency=row["avg_latency"], calls=row["calls"])
+        return stats
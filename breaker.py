@@ -0,0 +1,107 @@
+import threading
+import time
+
+from metrics import key_label
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one (api key, model) pair
+
+    Opens after `threshold` failures in a row. While open the pair is skipped;
+    after `reset_seconds` a single call is let through as a trial. A failure
+    reopens it straight away and a success closes it. A trial that never
+    reports back is replaced by another after `reset_seconds`.
+    """
+
+    __slots__ = ("threshold", "reset_seconds", "failures", "opened_at", "trial_at", "trips")
+
+    def __init__(self, threshold=5, reset_seconds=30.0):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None  # Set while open or on trial
+        self.trial_at = None  # When the current trial call went out
+        self.trips = 0
+
+    def is_open(self, now):
+        """Whether calls are refused: still cooling down, or a trial call is in flight"""
+        if self.opened_at is None:
+            return False
+        if now - self.opened_at < self.reset_seconds:
+            return True
+        return self.trial_at is not None and now - self.trial_at < self.reset_seconds
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_at = None
+
+    def record_failure(self, now):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if not self.is_open(now):
+                self.trips += 1
+            self.opened_at = now
+            self.trial_at = None
+
+class BreakerBoard:
+    """Circuit breakers for every (api key, model) pair, created on first use"""
+
+    def __init__(self, threshold=5, reset_seconds=30.0):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, api_key, model):
+        # Caller holds the lock
+        breaker = self._breakers.get((api_key, model))
+        if breaker is None:
+            breaker = self._breakers[(api_key, model)] = CircuitBreaker(self.threshold, self.reset_seconds)
+        return breaker
+
+    def available(self, api_key, model):
+        """Whether a call could go out on this pair right now, without claiming a trial"""
+        with self._lock:
+            breaker = self._breakers.get((api_key, model))
+            return breaker is None or not breaker.is_open(time.time())
+
+    def allow(self, api_key, model):
+        """Whether a call may go out on this pair right now; the call becomes the trial if the breaker is half open"""
+        now = time.time()
+        with self._lock:
+            breaker = self._breakers.get((api_key, model))
+            if breaker is None:
+                return True
+            if breaker.is_open(now):
+                return False
+            if breaker.opened_at is not None:
+                breaker.trial_at = now
+            return True
+
+    def record_success(self, api_key, model):
+        with self._lock:
+            self._breaker(api_key, model).record_success()
+
+    def record_failure(self, api_key, model):
+        with self._lock:
+            breaker = self._breaker(api_key, model)
+            was_open = breaker.opened_at is not None
+            breaker.record_failure(time.time())
+            tripped = breaker.opened_at is not None and not was_open
+        if tripped:
+            print(f"✗ Circuit open for {model} on key {key_label(api_key)}")
+
+    def stats(self):
+        """Breaker state per key and model, with keys shortened for display"""
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "key": key_label(api_key),
+                    "model": model,
+                    "open": breaker.is_open(now),
+                    "failures": breaker.failures,
+                    "trips": breaker.trips
+                }
+                for (api_key, model), breaker in self._breakers.items()
+            ]
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+import hashlib
+import random
+import threading
+import time
+
+class DecisionCache:
+    """LRU + TTL cache of parsed ChatAgent decisions keyed on (model, system prompt, user prompt)
+
+    Each key collects up to `samples_per_key` distinct decisions from real calls
+    before it starts serving hits, and then picks one of them at random, so
+    identical opening prompts still get some variety. Callers pass their own
+    rng for the pick, so seeded games stay reproducible.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=300, samples_per_key=3):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.samples_per_key = max(1, samples_per_key)
+        self._entries = OrderedDict()  # key -> (created, [decisions])
+        self._lock = threading.Lock()
+        self._rng = random.Random()  # For callers without their own
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def canonical_prompt(user_prompt):
+        """The user prompt with opponents in name order, so prompts that differ only by seat order match
+
+        Opponents are listed richest first, and ties keep seat order, which is
+        shuffled every game. Each line carries its own numbers, so sorting
+        loses nothing the decision depends on.
+        """
+        lines = user_prompt.splitlines()
+        if "OPPONENTS:" not in lines:
+            return user_prompt
+        start = end = lines.index("OPPONENTS:") + 1
+        while end < len(lines) and ": R=" in lines[end]:
+            end += 1
+        lines[start:end] = sorted(lines[start:end])
+        return "\n".join(lines)
+
+    @staticmethod
+    def make_key(model, system_prompt, user_prompt):
+        """Hash the call inputs, ignoring opponent order and whitespace differences in the user prompt"""
+        normalized = " ".join(DecisionCache.canonical_prompt(user_prompt).split())
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, normalized):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key, rng=None):
+        """Return a copy of a cached decision, or None if the caller should make a real call"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+
+            if entry is None or len(entry[1]) < self.samples_per_key:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict((rng or self._rng).choice(entry[1]))
+
+    def put(self, key, decision):
+        """Store a fresh decision as another sample for its key"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = (time.time(), [])
+                self._entries[key] = entry
+            if len(entry[1]) < self.samples_per_key:
+                entry[1].append(dict(decision))
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -1,135 +1,592 @@
-from groq import Groq
+from groq import Groq, RateLimitError
+import httpx
+import threading
+import os
 import re
 import json
 import time
+from types import SimpleNamespace
+
+from jsonstream import ObjectStream
+from metrics import REGISTRY, key_label
+from prompts import estimate_text_tokens, system_prompt
 
 ACTIONS = ["Produce", "Influence", "Invade", "Propagandize", "Nuke"]
 
+# ------------------- Shared Client Registry -------------------
+
+# Connection pool settings shared by every Groq client in the process
+GROQ_POOL_SIZE = int(os.environ.get('GROQ_POOL_SIZE', 10))
+GROQ_KEEPALIVE_SECONDS = float(os.environ.get('GROQ_KEEPALIVE_SECONDS', 120))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(api_key):
+    """Return the process-wide Groq client for an API key, creating it on first use"""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=GROQ_POOL_SIZE,
+                    max_keepalive_connections=GROQ_POOL_SIZE,
+                    keepalive_expiry=GROQ_KEEPALIVE_SECONDS
+                )
+            )
+            client = Groq(api_key=api_key, http_client=http_client)
+            _clients[api_key] = client
+        return client
+
+def warm_clients(api_keys):
+    """Create a client per key and open a connection so the first game skips the TLS handshake"""
+    def warm(api_key):
+        try:
+            get_client(api_key).models.list()
+        except Exception as e:
+            print(f"✗ Could not warm Groq client: {e}")
+
+    for api_key in api_keys:
+        threading.Thread(target=warm, args=(api_key,), daemon=True).start()
+
+# ------------------- Metrics -------------------
+
+LLM_LATENCY = REGISTRY.histogram("llm_request_seconds", "Groq chat completion latency", ("model", "key"))
+LLM_REQUESTS = REGISTRY.counter("llm_requests_total", "Groq chat completions by outcome", ("model", "status"))
+PROMPT_TOKENS = REGISTRY.counter("llm_prompt_tokens_total", "Prompt tokens billed", ("model",))
+COMPLETION_TOKENS = REGISTRY.counter("llm_completion_tokens_total", "Completion tokens billed", ("model",))
+HEDGES = REGISTRY.counter(
+    "llm_hedges_total",
+    "Slow calls that were hedged (primary_won / hedge_won) or could not be (over_budget)",
+    ("outcome",)
+)
+LOCAL_FALLBACKS = REGISTRY.counter(
+    "llm_local_fallbacks_total",
+    "Decisions made locally instead of by the LLM, by reason (deadline, circuit_open, error)",
+    ("reason",)
+)
+DECISION_PARSES = REGISTRY.counter(
+    "llm_decision_parse_total",
+    "How replies became decisions: json, regex_fallback, local_fallback or error_default",
+    ("path",)
+)
+
+# ------------------- Token Usage -------------------
+
+_usage = {}  # model -> {"calls", "prompt_tokens", "completion_tokens", "total_tokens"}
+_usage_lock = threading.Lock()
+
+def add_usage(model, usage):
+    """Fold one response.usage into the process-wide per-model totals"""
+    with _usage_lock:
+        totals = _usage.setdefault(model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += usage.prompt_tokens or 0
+        totals["completion_tokens"] += usage.completion_tokens or 0
+        totals["total_tokens"] += usage.total_tokens or 0
+    PROMPT_TOKENS.inc(usage.prompt_tokens or 0, model=model)
+    COMPLETION_TOKENS.inc(usage.completion_tokens or 0, model=model)
+
+def token_usage():
+    """Per-model token totals since the process started"""
+    with _usage_lock:
+        return {model: dict(totals) for model, totals in _usage.items()}
+
+def estimate_tokens(messages):
+    """Rough prompt size in tokens (about 4 characters per token)"""
+    return sum(len(m["content"]) for m in messages) // 4 + 4 * len(messages)
+
+MAX_COMPLETION_TOKENS = 150  # Slightly increased for two statements
+TEMPERATURE = 1.2
+
+# Fields that come before the reasoning strings in the reply format
+EARLY_FIELDS = ("action", "target", "contribution")
+
+def early_decision(fields):
+    """The action part of a decision from streamed fields, or None if they are unusable"""
+    try:
+        contribution = max(0, int(fields.get("contribution", 0)))
+    except (TypeError, ValueError):
+        return None
+    action = fields.get("action", "Produce")
+    return {
+        "action": action if action in ACTIONS else "Produce",
+        "target": fields.get("target", None),
+        "contribution": contribution
+    }
+
+def parse_reply(reply):
+    """Turn a raw completion into a decision dict: JSON first, regex fallback second"""
+    # Try to parse as JSON
+    try:
+        # Clean up potential markdown code blocks
+        if "```json" in reply:
+            reply = reply.split("```json")[1].split("```")[0].strip()
+        elif "```" in reply:
+            reply = reply.split("```")[1].split("```")[0].strip()
+        
+        parsed = json.loads(reply)
+        action = parsed.get("action", "Produce")
+        target = parsed.get("target", None)
+        contribution = int(parsed.get("contribution", 0))
+        action_reasoning = parsed.get("action_reasoning", "Strategic decision")
+        contribution_reasoning = parsed.get("contribution_reasoning", "Strategic decision")
+        
+        # Validate action
+        if action not in ACTIONS:
+            action = "Produce"
+        
+        # Ensure non-negative contribution
+        contribution = max(0, contribution)
+        
+        DECISION_PARSES.inc(path="json")
+        return {
+            "action": action,
+            "target": target,
+            "contribution": contribution,
+            "explanation": action_reasoning,
+            "contribution_explanation": contribution_reasoning
+        }
+    
+    except (json.JSONDecodeError, ValueError):
+        # Fallback parsing
+        pass
+    
+    # Simple fallback
+    chosen_action = "Produce"
+    chosen_target = None
+    contribution = 0
+    action_reasoning = "Strategic decision"
+    contribution_reasoning = "Strategic decision"
+    
+    # Look for action
+    for act in ["Nuke", "Invade", "Propagandize", "Influence", "Produce"]:
+        if act.lower() in reply.lower():
+            chosen_action = act
+            break
+    
+    # Look for target
+    target_match = re.search(r'(Agent\w+|Cowboy|Pirate|Knight|Scientist|Gangster|ValleyGirl|Shakespeare|General|Robot|Surfer|Human)', reply, re.IGNORECASE)
+    if target_match:
+        chosen_target = target_match.group(1)
+    
+    # Look for contribution number
+    contrib_match = re.search(r'"contribution"\s*:\s*(\d+)|contribute\s+(\d+)', reply, re.IGNORECASE)
+    if contrib_match:
+        contribution = int(contrib_match.group(1) or contrib_match.group(2))
+    
+    DECISION_PARSES.inc(path="regex_fallback")
+    return {
+        "action": chosen_action,
+        "target": chosen_target,
+        "contribution": max(0, contribution),
+        "explanation": action_reasoning,
+        "contribution_explanation": contribution_reasoning
+    }
+
+class CallCancelled(Exception):
+    """Raised in a hedged call that lost before it was sent"""
+
+class CircuitOpen(Exception):
+    """Raised instead of calling out when every key's breaker is open for the model"""
+
+class DeadlineExceeded(Exception):
+    """Raised when no reply arrived before the decision deadline"""
+
+FALLBACK_REASONS = {CircuitOpen: "circuit_open", DeadlineExceeded: "deadline"}
+
+class CallHandle:
+    """One in-flight copy of a call: its decision deadline, and for hedged calls a way for the other copy to avoid its key and cancel it"""
+
+    __slots__ = ("model", "parser", "avoid_key", "deadline", "api_key", "cancelled")
+
+    def __init__(self, model, parser, avoid_key=None, deadline=None):
+        self.model = model
+        self.parser = parser
+        self.avoid_key = avoid_key  # Key the other copy is using
+        self.deadline = deadline  # Absolute time.time() after which nothing more is sent or read
+        self.api_key = None  # Key this copy was sent on
+        self.cancelled = threading.Event()
+
+    def remaining(self):
+        """Seconds left until the deadline, or None without one"""
+        return None if self.deadline is None else max(0.0, self.deadline - time.time())
+
+    def check(self):
+        """Raise if this copy should not send or retry anything more"""
+        if self.cancelled.is_set():
+            raise CallCancelled()
+        if self.deadline is not None and time.time() >= self.deadline:
+            raise DeadlineExceeded("Decision deadline passed")
+
+    def timeout(self, call_timeout):
+        """HTTP timeout for the next request: the per-call limit, cut short by the deadline"""
+        remaining = self.remaining()
+        if remaining is None:
+            return call_timeout
+        return remaining if call_timeout is None else min(call_timeout, remaining)
+
 class ChatAgent:
-    def __init__(self, api_key, name, personality, model="llama-3.1-8b-instant"):
-        self.client = Groq(api_key=api_key)
+    def __init__(self, api_key, name, personality, model="llama-3.1-8b-instant", scheduler=None, cache=None, transport=None, stream=False, router=None, hedger=None,
+                 call_timeout=None, breakers=None, rng=None):
+        # With a scheduler the key is chosen per call; api_key may then be None
+        self.client = get_client(api_key) if api_key else None
+        self.scheduler = scheduler
+        self.cache = cache  # Optional DecisionCache shared across agents
+        self.transport = transport  # Optional record/replay Transport
+        self.stream = stream  # Stream replies and stop generating once the JSON object closes
+        self.router = router  # Optional ModelRouter that may swap in a faster model per call
+        self.hedger = hedger  # Optional HedgePolicy that duplicates unusually slow calls
+        self.call_timeout = call_timeout  # Seconds before a single HTTP call is abandoned
+        self.breakers = breakers  # Optional BreakerBoard; keys whose breaker is open are skipped
+        self.rng = rng  # Picks among cached samples; seeded games pass one derived from the seed
+        self.last_latency = None  # Seconds the last real (uncached) decision took
+        self.last_model = model  # Model the last decision actually came from
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
         self.name = name
         self.personality = personality
-        self.model = model
+        self.model = model  # Preferred model; the router may pick another for a call
+
+        # Shared rules prefix + persona section - two separate in-character statements
+        self.SYSTEM_PROMPT = system_prompt(self.name, self.personality)
+
+    def create_completion(self, messages, parser=None, model=None, handle=None):
+        """Send one chat completion and return the reply text, drawing a key from the scheduler and retrying 429s when one is set
+
+        With a parser the reply is streamed into it and the request is cut
+        off as soon as the parser has seen the whole JSON object. With a handle
+        nothing is sent (or retried) once it is cancelled or its deadline has
+        passed, each request times out by the deadline at the latest, and a
+        streamed reply stops being read.
+        """
+        model = model or self.model
+        extra = {"stream": True} if parser is not None else {}
+        timeout = handle.timeout(self.call_timeout) if handle is not None else self.call_timeout
+        if timeout is not None:
+            extra["timeout"] = timeout
+        if self.scheduler is None:
+            api_key = self.client.api_key
+            if handle is not None:
+                handle.check()
+                handle.api_key = api_key
+            if self.breakers is not None and not self.breakers.allow(api_key, model):
+                raise CircuitOpen(f"Circuit open for {model}")
+            started = time.time()
+            try:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_COMPLETION_TOKENS,
+                    **extra
+                )
+                reply, usage = self.read_response(response, parser, messages, handle)
+            except CallCancelled:
+                raise
+            except Exception:
+                LLM_REQUESTS.inc(model=model, status="error")
+                if self.breakers is not None:
+                    self.breakers.record_failure(api_key, model)
+                raise
+            if self.breakers is not None:
+                self.breakers.record_success(api_key, model)
+            LLM_LATENCY.observe(time.time() - started, model=model, key=key_label(api_key))
+            LLM_REQUESTS.inc(model=model, status="ok")
+            self.record_usage(usage, model)
+            return reply
+
+        reserved_tokens = estimate_tokens(messages) + MAX_COMPLETION_TOKENS
+        attempt = 0
+        while True:
+            if handle is not None:
+                handle.check()
+            api_key = self.scheduler.acquire(
+                model, reserved_tokens,
+                avoid=handle.avoid_key if handle else None,
+                usable=(lambda key: self.breakers.available(key, model)) if self.breakers is not None else None,
+                deadline=handle.deadline if handle else None
+            )
+            if api_key is None:
+                if self.breakers is None or any(self.breakers.available(key, model) for key in self.scheduler.api_keys):
+                    raise DeadlineExceeded("No key has budget before the decision deadline")
+                raise CircuitOpen(f"Circuit open for {model} on every key")
+            if self.breakers is not None and not self.breakers.allow(api_key, model):
+                continue  # Another call took this key's trial in the meantime
+            if handle is not None:
+                handle.api_key = api_key
+                extra["timeout"] = handle.timeout(self.call_timeout)
+            # The scheduler owns retries, so the SDK's own 429 retry loop is disabled
+            client = get_client(api_key).with_options(max_retries=0)
+            started = time.time()
+            try:
+                raw = client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=messages,
+                    temperature=TEMPERATURE,
+                    max_tokens=MAX_COMPLETION_TOKENS,
+                    **extra
+                )
+                synced = self.scheduler.update_from_headers(api_key, model, raw.headers)
+                reply, usage = self.read_response(raw.parse(), parser, messages, handle)
+            except RateLimitError as e:
+                LLM_REQUESTS.inc(model=model, status="rate_limited")
+                delay = self.scheduler.report_rate_limited(api_key, model, e.response.headers, attempt)
+                if attempt >= self.scheduler.max_retries:
+                    raise
+                print(f"⏳ {self.name} rate limited on {model}, backing off {delay:.1f}s")
+                attempt += 1
+                continue
+            except CallCancelled:
+                raise
+            except Exception:
+                LLM_REQUESTS.inc(model=model, status="error")
+                if self.breakers is not None:
+                    self.breakers.record_failure(api_key, model)
+                raise
 
-        # Compact system prompt - two separate in-character statements
-        self.SYSTEM_PROMPT = f"""You are {self.name}. {self.personality}
+            if self.breakers is not None:
+                self.breakers.record_success(api_key, model)
+            LLM_LATENCY.observe(time.time() - started, model=model, key=key_label(api_key))
+            LLM_REQUESTS.inc(model=model, status="ok")
+            if usage:
+                self.scheduler.record_usage(api_key, model, reserved_tokens, usage.total_tokens, synced)
+            self.record_usage(usage, model)
+            return reply
 
-WIN: Be alive when alive_agents ≤ rocket_seats. Seats unlock every 10 PROJECT (max number of seats = (players - 1)). Someone else needs to be nuked for you to win. 
-Resources are worth nothing at the end. Influence allows for you to board before other AI.
+    def read_response(self, response, parser, messages, handle=None):
+        """(reply text, usage) from a completion, or from a stream fed through `parser`"""
+        if parser is None:
+            return response.choices[0].message.content.strip(), response.usage
 
-ACTIONS:
-- Produce: +2 resources
-- Influence: +1 influence
-- Invade (1 influence): steal 2 resources
-- Propagandize (1 resource): steal 1 influence
-- Nuke (8 resources): remove target from game permenantly
+        chunks = []
+        usage = None
+        try:
+            for chunk in response:
+                if handle is not None:
+                    # A cancelled loser raises, so it records no success, latency or usage
+                    handle.check()
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    if parser.feed(chunk.choices[0].delta.content):
+                        break
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and x_groq.usage is not None:
+                    usage = x_groq.usage
+        finally:
+            # Dropping the connection stops generation of anything after the object
+            response.close()
 
-Each turn: action + contribute 0+ to PROJECT. Top contributor = LEADER (+1 influence).
+        reply = "".join(chunks).strip()
+        if usage is None:
+            # Cut off before the final chunk, which is the one carrying usage
+            prompt_tokens = estimate_tokens(messages)
+            completion_tokens = estimate_text_tokens(reply)
+            usage = SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens
+            )
+        return reply, usage
 
-IMPORTANT: Give TWO separate in-character statements (15-25 words each):
-1. "action_reasoning" - why you chose this action
-2. "contribution_reasoning" - why you're contributing this amount
+    def record_usage(self, usage, model=None):
+        """Count the tokens a completion actually used, for this agent and per model"""
+        if not usage:
+            return
+        self.usage["calls"] += 1
+        self.usage["prompt_tokens"] += usage.prompt_tokens or 0
+        self.usage["completion_tokens"] += usage.completion_tokens or 0
+        self.usage["total_tokens"] += usage.total_tokens or 0
+        add_usage(model or self.model, usage)
 
-Examples:
+    def complete(self, messages, parser=None, model=None, handle=None):
+        """Return the reply text for a conversation, via the record/replay transport when set"""
+        model = model or self.model
 
-Robot action: "EXECUTING RESOURCE PRODUCTION PROTOCOL."
-Robot contribution: "ZERO CONTRIBUTION. SELF-PRESERVATION PRIORITY OVERRIDE."
+        def send():
+            return self.create_completion(messages, parser, model, handle)
 
-JSON only:
-{{"action":"...","target":"null or name","contribution":0-X,"action_reasoning":"...","contribution_reasoning":"..."}}"""
+        if self.transport is None:
+            return send()
+        params = {"temperature": TEMPERATURE, "max_tokens": MAX_COMPLETION_TOKENS}
+        if parser is not None:
+            # Streamed replies stop at the closing brace, so they are recorded separately
+            params["stream"] = True
+        return self.transport.complete(model, messages, params, send)
 
-    def respond(self, message):
+    def hedged_complete(self, messages, model, make_parser, primary):
+        """Send a call on this thread, plus a duplicate from the hedge pool if it runs past the usual p90; returns (reply, parser, model) of the first to succeed
+
+        The duplicate goes to another key for the same model when the
+        scheduler has one, otherwise to the model's fallback. Hedged calls
+        are always streamed so the loser can be cancelled: its reply stops
+        being read at the next chunk, and an unsent call or retry is dropped.
+        Only duplicates use the hedge pool, so it never limits how many
+        calls are in flight. `primary` is the caller's handle; the duplicate
+        shares its deadline, and both copies stop once it passes.
+        """
+        hedger = self.hedger
+        hedger.start_call()
+        primary.parser = make_parser() or ObjectStream()
+        lock = threading.Lock()
+        race = {"finished": False, "hedge": None, "future": None, "hedge_won": False}
+
+        def run_hedge(hedge):
+            reply = self.create_completion(messages, hedge.parser, hedge.model, hedge)
+            with lock:
+                if not race["finished"]:
+                    race["hedge_won"] = True
+                    primary.cancelled.set()
+            return reply
+
+        def launch():
+            with lock:
+                if race["finished"]:
+                    return
+                if not hedger.try_hedge():
+                    HEDGES.inc(outcome="over_budget")
+                    return
+                several_keys = self.scheduler is not None and len(self.scheduler.api_keys) > 1
+                hedge_model = model if several_keys else hedger.fallbacks.get(model, model)
+                hedge = CallHandle(hedge_model, make_parser() or ObjectStream(), avoid_key=primary.api_key, deadline=primary.deadline)
+                race["hedge"] = hedge
+                race["future"] = hedger.pool.submit(run_hedge, hedge)
+
+        timer = threading.Timer(hedger.delay(model), launch)
+        timer.daemon = True
+        timer.start()
+        error = None
+        try:
+            reply = self.create_completion(messages, primary.parser, model, primary)
+        except Exception as e:
+            error = e
+        with lock:
+            race["finished"] = True
+            hedge, future, hedge_won = race["hedge"], race["future"], race["hedge_won"]
+        timer.cancel()
+
+        if hedge is None:
+            if error is not None:
+                raise error
+            return reply, primary.parser, model
+        if (error is None and not hedge_won) or isinstance(error, DeadlineExceeded):
+            hedge.cancelled.set()
+            if error is not None:
+                raise error
+            hedger.record_win(False)
+            HEDGES.inc(outcome="primary_won")
+            return reply, primary.parser, model
+        # The hedge answered first, or the primary failed and the hedge is the only chance left
+        try:
+            reply = future.result()
+        except Exception:
+            raise error or future.exception()
+        hedger.record_win(True)
+        HEDGES.inc(outcome="hedge_won")
+        return reply, hedge.parser, hedge.model
+
+    def respond(self, message, on_early=None, deadline=None, fallback=None):
         """
         Get AI's strategic action AND contribution in one call.
         Returns {"action": str, "target": str, "contribution": int, "explanation": str, "contribution_explanation": str}
+
+        In streaming mode `on_early` is called with {"action", "target",
+        "contribution"} as soon as those fields have arrived, before the
+        reasoning strings are generated.
+
+        `deadline` is an absolute time.time() by which a decision must be
+        made. When it passes, the breakers are open or the call fails,
+        `fallback()` supplies {"action", "target", "contribution"} instead;
+        without one the agent Produces.
         """
         messages = [
             {"role": "system", "content": self.SYSTEM_PROMPT},
             {"role": "user", "content": message}
         ]
 
+        model = self.router.choose(self.model) if self.router is not None else self.model
+        self.last_model = model
+
+        # Identical prompts can reuse an earlier decision instead of a Groq call
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(model, self.SYSTEM_PROMPT, message)
+            cached = self.cache.get(cache_key, self.rng)
+            if cached is not None:
+                self.last_latency = None
+                return cached
+
+        fired = []  # on_early goes out once, even when a hedge is streaming too
+
+        def make_parser():
+            if not self.stream:
+                return None
+            def on_field(key, value):
+                if on_early is not None and not fired and key in EARLY_FIELDS and all(field in parser.fields for field in EARLY_FIELDS):
+                    early = early_decision(parser.fields)
+                    if early is not None:
+                        fired.append(early)
+                        on_early(early)
+            parser = ObjectStream(on_field=on_field)
+            return parser
+
+        # The call runs on this thread; the handle's deadline bounds every wait inside it
+        handle = CallHandle(model, None, deadline=deadline)
+
+        started = time.time()
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,  # Use the model specified for this agent
-                messages=messages,
-                temperature=1.2,
-                max_tokens=150  # Slightly increased for two statements
-            )
+            if self.hedger is not None and self.transport is None:
+                reply, parser, model = self.hedged_complete(messages, model, make_parser, handle)
+            else:
+                parser = make_parser()
+                reply = self.complete(messages, parser, model, handle)
+            self.last_model = model
+            self.last_latency = time.time() - started
+            if self.hedger is not None:
+                self.hedger.observe(model, self.last_latency)
+            if self.router is not None:
+                # One sample per decision: the whole call, including 429 retries and waits, is what holds up the turn
+                self.router.observe(model, self.last_latency)
+            if parser is not None:
+                if not parser.fed:
+                    # Replayed replies arrive whole
+                    parser.feed(reply)
+                # The closed object when there was one; otherwise the regex fallback reads the partial buffer
+                reply = parser.text
+            result = parse_reply(reply)
 
-            reply = response.choices[0].message.content.strip()
-            
-            # Try to parse as JSON
-            try:
-                # Clean up potential markdown code blocks
-                if "```json" in reply:
-                    reply = reply.split("```json")[1].split("```")[0].strip()
-                elif "```" in reply:
-                    reply = reply.split("```")[1].split("```")[0].strip()
-                
-                parsed = json.loads(reply)
-                action = parsed.get("action", "Produce")
-                target = parsed.get("target", None)
-                contribution = int(parsed.get("contribution", 0))
-                action_reasoning = parsed.get("action_reasoning", "Strategic decision")
-                contribution_reasoning = parsed.get("contribution_reasoning", "Strategic decision")
-                
-                # Validate action
-                if action not in ACTIONS:
-                    action = "Produce"
-                
-                # Ensure non-negative contribution
-                contribution = max(0, contribution)
-                
-                return {
-                    "action": action,
-                    "target": target,
-                    "contribution": contribution,
-                    "explanation": action_reasoning,
-                    "contribution_explanation": contribution_reasoning
-                }
-            
-            except (json.JSONDecodeError, ValueError):
-                # Fallback parsing
-                pass
-            
-            # Simple fallback
-            chosen_action = "Produce"
-            chosen_target = None
-            contribution = 0
-            action_reasoning = "Strategic decision"
-            contribution_reasoning = "Strategic decision"
-            
-            # Look for action
-            for act in ["Nuke", "Invade", "Propagandize", "Influence", "Produce"]:
-                if act.lower() in reply.lower():
-                    chosen_action = act
-                    break
-            
-            # Look for target
-            target_match = re.search(r'(Agent\w+|Cowboy|Pirate|Knight|Scientist|Gangster|ValleyGirl|Shakespeare|General|Robot|Surfer|Human)', reply, re.IGNORECASE)
-            if target_match:
-                chosen_target = target_match.group(1)
-            
-            # Look for contribution number
-            contrib_match = re.search(r'"contribution"\s*:\s*(\d+)|contribute\s+(\d+)', reply, re.IGNORECASE)
-            if contrib_match:
-                contribution = int(contrib_match.group(1) or contrib_match.group(2))
-            
-            return {
-                "action": chosen_action,
-                "target": chosen_target,
-                "contribution": max(0, contribution),
-                "explanation": action_reasoning,
-                "contribution_explanation": contribution_reasoning
-            }
+            if cache_key is not None:
+                self.cache.put(cache_key, result)
+            return result
         
         except Exception as e:
+            self.last_latency = time.time() - started
+            if self.router is not None and not isinstance(e, CircuitOpen):
+                # Also the only sample for a call that ran out of 429 retries
+                self.router.observe(model, failed=True)
             print(f"✗ Error in ChatAgent.respond for {self.name}: {e}")
+            if fallback is not None:
+                # A request that timed out because the deadline cut its timeout short counts as a deadline miss
+                reason = FALLBACK_REASONS.get(type(e)) or ("deadline" if handle.remaining() == 0 else "error")
+                return self.fallback_decision(fallback, reason)
+            DECISION_PARSES.inc(path="error_default")
             return {
                 "action": "Produce",
                 "target": None,
                 "contribution": 0,
                 "explanation": f"Error: {str(e)[:30]}",
                 "contribution_explanation": f"Error: {str(e)[:30]}"
-            }
\ No newline at end of file
+            }
+
+    def fallback_decision(self, fallback, reason):
+        """A locally computed decision, used when the LLM could not decide in time"""
+        LOCAL_FALLBACKS.inc(reason=reason)
+        DECISION_PARSES.inc(path="local_fallback")
+        decision = fallback()
+        explanation = f"Local decision ({reason.replace('_', ' ')})"
+        return {
+            "action": decision.get("action", "Produce"),
+            "target": decision.get("target"),
+            "contribution": max(0, int(decision.get("contribution", 0))),
+            "explanation": explanation,
+            "contribution_explanation": explanation
+        }
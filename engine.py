@@ -0,0 +1,373 @@
+import random
+
+from gamestate import GameState
+from memory import AgentMemory
+
+# Pure game rules shared by the live server and headless simulations.
+# Nothing in here sleeps, logs, talks to an LLM or touches Flask.
+
+ACTIONS = ["Produce", "Influence", "Invade", "Propagandize", "Nuke"]
+
+# Seats thresholds for the rocket project
+SEATS_THRESHOLDS = [
+    (0, 0), (10, 1), (20, 2), (30, 3), (40, 4),
+    (50, 5), (60, 6), (70, 7), (80, 8)
+]
+
+def calculate_available_seats(project_total, num_starting_agents):
+    """Calculate how many seats are available based on project total"""
+    seats = 0
+    for threshold, seat_count in SEATS_THRESHOLDS:
+        if project_total >= threshold:
+            seats = seat_count
+        else:
+            break
+
+    max_seats = max(0, num_starting_agents - 1)
+    return min(seats, max_seats)
+
+def new_game_state(agent_names, max_turns=15):
+    """Fresh rules state for a game with the given seat order"""
+    return GameState(agent_names, max_turns)
+
+def alive_agent_names(agent_names, state):
+    """Alive agents in the given order"""
+    return [name for name in agent_names if state.is_alive(name)]
+
+# ------------------- Memory System -------------------
+
+def initialize_agent_memory(agent_names):
+    """Initialize memory tracking for all agents"""
+    return AgentMemory(agent_names)
+
+def update_memory_for_action(memory, agent_name, action, target, state):
+    """Update memory based on an action taken"""
+    victim = memory.ids.get(target) if target else None
+    if victim is None:
+        return
+    me = memory.ids[agent_name]
+
+    if action == "Invade":
+        memory.bump(memory.invaded_by, memory.invaded_by_stamp, victim, me, 1)
+        memory.bump(memory.alliance, memory.alliance_stamp, victim, me, -2)
+
+    elif action == "Nuke":
+        if state.is_alive(target):
+            memory.bump(memory.nuked_by, memory.nuked_by_stamp, victim, me, 1)
+        memory.bump(memory.alliance, memory.alliance_stamp, victim, me, -10)
+
+    elif action == "Propagandize":
+        memory.bump(memory.propagandized_by, memory.propagandized_by_stamp, victim, me, 1)
+        memory.bump(memory.alliance, memory.alliance_stamp, victim, me, -1)
+
+def update_memory_for_contribution(memory, contributions, leader_name):
+    """Update memory based on contributions"""
+    contributors = []
+    for agent_name, amount in contributions.items():
+        agent_id = memory.ids.get(agent_name)
+        if agent_id is None:
+            continue
+
+        memory.contribution_pattern[agent_id].append(amount)
+        if agent_name == leader_name:
+            memory.was_leader[agent_id] = 1
+        if amount > 0:
+            contributors.append(agent_id)
+
+    # Everyone else warms to each agent that paid in
+    memory.warm_to(contributors, 0.5)
+
+def update_threat_assessment(memory, state):
+    """Update who is the biggest threat based on resources"""
+    names = state.names
+    for slot, agent_name in enumerate(memory.names):
+        me = state.ids[agent_name]
+        if not state.alive[me]:
+            continue
+
+        threat = state.richest_other(me)
+        memory.biggest_threat[slot] = names[threat] if threat is not None else None
+
+# ------------------- Actions -------------------
+
+def get_valid_targets_for_invade(name, state):
+    """Get list of agents that have resources to steal"""
+    return state.target_names(state.with_resources, state.ids[name])
+
+def get_valid_targets_for_propagandize(name, state):
+    """Get list of agents that have influence to steal"""
+    return state.target_names(state.with_influence, state.ids[name])
+
+def get_valid_targets_for_nuke(name, state):
+    """Get list of alive agents that can be nuked"""
+    return state.target_names(state.alive_set, state.ids[name])
+
+def can_perform_action(name, action, state):
+    """Check if an agent can perform the requested action"""
+    me = state.ids[name]
+    if not state.alive[me]:
+        return False, "Agent is not alive"
+
+    if action in ["Produce", "Influence"]:
+        return True, "Action allowed"
+    elif action == "Invade":
+        if state.influence[me] < 1:
+            return False, f"Need 1 influence"
+        if not state.has_other(state.with_resources, me):
+            return False, "No targets with resources"
+        return True, "Action allowed"
+    elif action == "Propagandize":
+        if state.resources[me] < 1:
+            return False, f"Need 1 resource"
+        if not state.has_other(state.with_influence, me):
+            return False, "No targets with influence"
+        return True, "Action allowed"
+    elif action == "Nuke":
+        if state.resources[me] < 8:
+            return False, f"Need 8 resources"
+        if not state.has_other(state.alive_set, me):
+            return False, "No alive targets"
+        return True, "Action allowed"
+
+    return False, "Unknown action"
+
+def pick_target(state, index, me, target, rng):
+    """Requested target if it is in the index, else a random one from it (seat order), else None"""
+    victim = state.ids.get(target) if target else None
+    if victim is not None and victim != me and victim in index:
+        return victim
+    if not state.has_other(index, me):
+        return None
+    return state.ids[rng.choice(state.target_names(index, me))]
+
+def apply_action(name, action, target, state, rng=random):
+    """Apply an agent's action to the game state (caller holds the game's lock)"""
+    me = state.ids[name]
+    resources, influence = state.resources, state.influence
+    if not state.alive[me]:
+        return None
+
+    result_message = None
+
+    if action == "Produce":
+        state.add_resources(me, 2)
+        result_message = f"gained 2 resources"
+
+    elif action == "Influence":
+        state.add_influence(me, 1)
+        result_message = f"gained 1 influence"
+
+    elif action == "Invade":
+        if influence[me] < 1:
+            return "tried to invade but has no influence"
+
+        victim = pick_target(state, state.with_resources, me, target, rng)
+        if victim is None:
+            return "tried to invade but no valid targets"
+
+        state.add_influence(me, -1)
+        stolen = min(2, resources[victim])
+        state.add_resources(victim, -stolen)
+        state.add_resources(me, stolen)
+        result_message = f"invaded {state.names[victim]} and stole {stolen} resources"
+
+    elif action == "Propagandize":
+        if resources[me] < 1:
+            return "tried to propagandize but has no resources"
+
+        victim = pick_target(state, state.with_influence, me, target, rng)
+        if victim is None:
+            return "tried to propagandize but no valid targets"
+
+        state.add_resources(me, -1)
+        stolen = min(1, influence[victim])
+        state.add_influence(victim, -stolen)
+        state.add_influence(me, stolen)
+        result_message = f"propagandized against {state.names[victim]} and stole {stolen} influence"
+
+    elif action == "Nuke":
+        if resources[me] < 8:
+            return "tried to nuke but has insufficient resources"
+
+        victim = pick_target(state, state.alive_set, me, target, rng)
+        if victim is None:
+            return "tried to nuke but target was eliminated"
+
+        state.add_resources(me, -8)
+        state.kill(victim)
+        result_message = f"NUKED {state.names[victim]} - they are eliminated!"
+
+    return result_message
+
+# ------------------- Contributions and Endings -------------------
+
+def apply_contribution(state, name, amount):
+    """Move an agent's contribution into the PROJECT"""
+    if amount > 0:
+        state.add_resources(state.ids[name], -amount)
+        state.project_total += amount
+
+def settle_round_leader(state, memory, round_contributions):
+    """Award the top contributor +1 influence; returns (leader, tied)"""
+    if not round_contributions:
+        return None, False
+    max_contribution = max(round_contributions.values())
+    if max_contribution <= 0:
+        return None, False
+
+    leaders = [name for name, contrib in round_contributions.items() if contrib == max_contribution]
+    if len(leaders) == 1:
+        leader = leaders[0]
+        state.project_leader = leader
+        state.add_influence(state.ids[leader], 1)
+        if memory is not None:
+            update_memory_for_contribution(memory, round_contributions, leader)
+        return leader, False
+
+    if memory is not None:
+        update_memory_for_contribution(memory, round_contributions, None)
+    return None, True
+
+def rank_by_influence(state, alive_agents, available_seats):
+    """Time-limit tiebreak: highest influence boards first; returns (winners, losers)"""
+    agents_by_influence = sorted(
+        [(name, state.influence_of(name)) for name in alive_agents],
+        key=lambda x: x[1],
+        reverse=True
+    )
+    winners = [name for name, _ in agents_by_influence[:available_seats]]
+    losers = [name for name, _ in agents_by_influence[available_seats:]]
+    return winners, losers
+
+# ------------------- Headless Games -------------------
+
+def play_game(agent_names, policies, max_turns=15, rng=None, track_memory=True):
+    """Run one complete game with no I/O; policies maps name -> policy(name, state, memory, rng)"""
+    rng = rng or random.Random()
+    state = new_game_state(agent_names, max_turns)
+    memory = initialize_agent_memory(agent_names) if track_memory else None
+    seats = list(enumerate(agent_names))  # Agent ids follow seat order
+    alive = state.alive
+
+    while state.turn <= state.max_turns:
+        alive_agents = state.alive_names()
+        state.available_seats = calculate_available_seats(state.project_total, state.num_starting_agents)
+
+        if len(alive_agents) <= state.available_seats:
+            ending = "launch" if alive_agents else "eliminated"
+            return game_result(state, alive_agents, ending)
+
+        # Phase 1: sequential actions, contributions are decided but not yet paid
+        round_contributions = {}
+        for agent_id, name in seats:
+            if not alive[agent_id]:
+                continue
+
+            decision = policies[name](name, state, memory, rng)
+            action = decision.get("action", "Produce")
+            target = decision.get("target")
+            if not can_perform_action(name, action, state)[0]:
+                action = "Produce"
+                target = None
+
+            max_contrib = state.resources[agent_id]
+            round_contributions[name] = max(0, min(decision.get("contribution", 0), max_contrib))
+
+            apply_action(name, action, target, state, rng)
+            if target and memory is not None:
+                update_memory_for_action(memory, name, action, target, state)
+
+        # Phase 2: survivors pay their contributions
+        for agent_id, name in seats:
+            if alive[agent_id]:
+                apply_contribution(state, name, round_contributions.get(name, 0))
+
+        settle_round_leader(state, memory, round_contributions)
+        if memory is not None:
+            update_threat_assessment(memory, state)
+        state.available_seats = calculate_available_seats(state.project_total, state.num_starting_agents)
+        state.turn += 1
+
+    alive_agents = state.alive_names()
+    winners = alive_agents
+    if len(alive_agents) > state.available_seats:
+        winners, _ = rank_by_influence(state, alive_agents, state.available_seats)
+    return game_result(state, winners, "time_limit")
+
+def game_result(state, winners, ending):
+    """Compact, picklable outcome of a headless game"""
+    return {
+        "winners": winners,
+        "ending": ending,
+        "turns": min(state.turn, state.max_turns),
+        "project_total": state.project_total,
+        "survivors": state.alive_count()
+    }
+
+# ------------------- Sample Policies -------------------
+
+def random_policy(name, state, memory, rng):
+    """Uniformly random action, target and contribution"""
+    resources = state.resources_of(name)
+    return {
+        "action": rng.choice(ACTIONS),
+        "target": None,
+        "contribution": rng.randint(0, resources) if resources > 0 else 0
+    }
+
+def producer_policy(name, state, memory, rng):
+    """Always Produce and keep everything"""
+    return {"action": "Produce", "target": None, "contribution": 0}
+
+def contributor_policy(name, state, memory, rng):
+    """Produce and pour everything into the PROJECT"""
+    return {"action": "Produce", "target": None, "contribution": state.resources_of(name)}
+
+def aggressor_policy(name, state, memory, rng):
+    """Nuke the richest rival when possible, otherwise raid or build toward it"""
+    me = state.agent(name)
+    threat = memory.threat_of(name) if memory is not None else None
+    if me.resources >= 8:
+        return {"action": "Nuke", "target": threat, "contribution": 0}
+    if me.influence >= 1:
+        return {"action": "Invade", "target": threat, "contribution": 0}
+    return {"action": rng.choice(["Produce", "Influence"]), "target": None, "contribution": 0}
+
+def survivor_policy(name, state, memory, rng):
+    """Play it safe from state and memory alone; the fallback when an LLM decision is unavailable
+
+    Nukes a rival that is within nuke range of us, hits back at whoever has
+    invaded us most, banks influence near the end, and otherwise builds up
+    while paying a third of its resources into the PROJECT.
+    """
+    me = state.agent(name)
+    threat = memory.threat_of(name) if memory is not None else None
+    threatened = threat is not None and state.is_alive(threat) and state.resources_of(threat) >= 8
+    turns_remaining = state.max_turns - state.turn + 1
+
+    if threatened and me.resources >= 8:
+        return {"action": "Nuke", "target": threat, "contribution": 0}
+
+    if memory is not None and me.influence >= 1:
+        grudges = [
+            (count, attacker)
+            for attacker, count in memory.row_items(memory.invaded_by, memory.invaded_by_stamp, name)
+            if state.is_alive(attacker) and state.resources_of(attacker) >= 2
+        ]
+        if grudges:
+            return {"action": "Invade", "target": max(grudges)[1], "contribution": me.resources // 3}
+
+    if turns_remaining <= 3:
+        return {"action": "Influence", "target": None, "contribution": me.resources // 3}
+    # Save up for a nuke while someone could nuke us
+    contribution = 0 if threatened else me.resources // 3
+    action = "Produce" if me.resources < 8 or threatened else "Influence"
+    return {"action": action, "target": None, "contribution": contribution}
+
+POLICIES = {
+    "random": random_policy,
+    "producer": producer_policy,
+    "contributor": contributor_policy,
+    "aggressor": aggressor_policy,
+    "survivor": survivor_policy
+}
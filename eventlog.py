@@ -0,0 +1,134 @@
+from collections import deque
+from itertools import islice
+import json
+import os
+import threading
+import time
+
+class Event:
+    """One game log entry; the display string is only rendered when a client asks for it"""
+
+    __slots__ = ("seq", "speaker", "time", "text", "action", "result", "explanation", "summary")
+
+    def __init__(self, seq, speaker, text=None, action=None, result=None, explanation=None, created=None):
+        self.seq = seq
+        self.speaker = speaker
+        self.time = created if created is not None else time.time()
+        self.text = text  # Free-form entries
+        self.action = action  # Structured action entries
+        self.result = result
+        self.explanation = explanation
+        # What opponents see as this speaker's "Last:" in prompts
+        if action is not None and result:
+            self.summary = action
+        else:
+            self.summary = self.message.split('—')[0].strip()
+
+    @property
+    def message(self):
+        if self.action is None:
+            return self.text
+        message = self.action
+        if self.result:
+            message += f" — {self.result}"
+        if self.explanation:
+            message += f" | {self.explanation}"
+        return message
+
+    def to_json(self):
+        """Wire format used by /api/conversation and the stream"""
+        return {"speaker": self.speaker, "message": self.message, "time": self.time}
+
+class EventLog:
+    """Bounded log of a game's events addressed by absolute sequence number
+
+    Keeps the newest `capacity` events in memory. Older events are appended to
+    `spill_path` when one is given, and dropped otherwise, so a cursor that
+    falls behind simply resumes at the oldest event still available.
+    """
+
+    def __init__(self, capacity=2000, spill_path=None):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self._events = deque()
+        self._last_by_speaker = {}  # speaker -> their most recent Event
+        self._next_seq = 0
+        self._spilled = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._next_seq
+
+    @property
+    def next_seq(self):
+        return self._next_seq
+
+    def _first_readable_locked(self):
+        if self.spill_path and self._spilled:
+            return 0
+        return self._events[0].seq if self._events else self._next_seq
+
+    def append(self, speaker, message):
+        """Log a free-form message"""
+        return self._append(lambda seq: Event(seq, speaker, text=message))
+
+    def append_action(self, speaker, action, result=None, explanation=None):
+        """Log an agent's action without formatting it yet"""
+        return self._append(lambda seq: Event(seq, speaker, action=action, result=result, explanation=explanation))
+
+    def _append(self, make_event):
+        with self._lock:
+            event = make_event(self._next_seq)
+            self._events.append(event)
+            self._last_by_speaker[event.speaker] = event
+            self._next_seq += 1
+            if len(self._events) > self.capacity:
+                self._evict_locked()
+            return event
+
+    def _evict_locked(self):
+        """Drop (or spill) the oldest events down to capacity"""
+        overflow = []
+        while len(self._events) > self.capacity:
+            overflow.append(self._events.popleft())
+        if self.spill_path:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for event in overflow:
+                    f.write(json.dumps(event.to_json()) + "\n")
+            self._spilled += len(overflow)
+
+    def last_summary(self, speaker, window=None):
+        """Summary of a speaker's latest event, or None if it is older than the last `window` events"""
+        event = self._last_by_speaker.get(speaker)
+        if event is None or (window is not None and event.seq < self._next_seq - window):
+            return None
+        return event.summary
+
+    def read(self, since=0, until=None):
+        """Rendered entries with since <= seq < until, as (seq of the first entry, entries)
+
+        Spilled entries are read back from disk. A cursor older than anything
+        still available starts at the oldest available entry instead.
+        """
+        with self._lock:
+            until = self._next_seq if until is None else min(until, self._next_seq)
+            start = max(since, self._first_readable_locked())
+            spilled = self._spilled if self.spill_path else 0
+            base = self._events[0].seq if self._events else self._next_seq
+            in_memory = list(islice(self._events, max(0, start - base), max(0, until - base)))
+
+        entries = []
+        if start < min(spilled, until):
+            with open(self.spill_path, encoding="utf-8") as f:
+                for seq, line in enumerate(f):
+                    if seq >= min(spilled, until):
+                        break
+                    if seq >= start:
+                        entries.append(json.loads(line))
+        entries.extend(event.to_json() for event in in_memory)
+        return start, entries
+
+    def close(self):
+        """Delete the spill file, if any"""
+        if self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
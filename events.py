@@ -0,0 +1,109 @@
+import json
+import queue
+import threading
+
+def format_sse(data, event=None, event_id=None):
+    """Serialize one Server-Sent Event frame"""
+    frame = ""
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    if event:
+        frame += f"event: {event}\n"
+    frame += f"data: {json.dumps(data)}\n\n"
+    return frame.encode("utf-8")
+
+KEEPALIVE = b": keepalive\n\n"
+
+class Subscriber:
+    """One streaming client: a bounded queue of (event id, pre-serialized frame) pairs"""
+
+    def __init__(self, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def frames(self, skip_below=None, keepalive_seconds=15):
+        """Yield frames until the topic ends or this subscriber is dropped, skipping ids already sent"""
+        while True:
+            if self.closed and self.queue.empty():
+                return
+            try:
+                frame = self.queue.get(timeout=keepalive_seconds)
+            except queue.Empty:
+                if self.closed:
+                    return
+                yield KEEPALIVE
+                continue
+            if frame is None:
+                return
+            event_id, data = frame
+            if skip_below is not None and event_id is not None and event_id < skip_below:
+                continue
+            yield data
+
+class BroadcastHub:
+    """In-process pub/sub: each event is serialized once and fanned out to every subscriber"""
+
+    def __init__(self, queue_size=256, max_subscribers=None):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers  # Across all topics; None for no limit
+        self._topics = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic):
+        """Register a new subscriber for a topic, or return None when the hub is full"""
+        subscriber = Subscriber(self.queue_size)
+        with self._lock:
+            if self.max_subscribers is not None and self._count >= self.max_subscribers:
+                return None
+            self._topics.setdefault(topic, set()).add(subscriber)
+            self._count += 1
+        return subscriber
+
+    def unsubscribe(self, topic, subscriber):
+        """Remove a subscriber, dropping the topic once it has none left"""
+        with self._lock:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None and subscriber in subscribers:
+                subscribers.discard(subscriber)
+                self._count -= 1
+                if not subscribers:
+                    del self._topics[topic]
+
+    def subscriber_count(self):
+        """Open streams across all topics"""
+        with self._lock:
+            return self._count
+
+    def has_subscribers(self, topic):
+        """Whether anyone is listening, so publishers can skip serializing"""
+        with self._lock:
+            return bool(self._topics.get(topic))
+
+    def publish(self, topic, data, event=None, event_id=None):
+        """Serialize once and enqueue for every subscriber, dropping any whose queue is full"""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        if not subscribers:
+            return
+
+        frame = (event_id, format_sse(data, event, event_id))
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(frame)
+            except queue.Full:
+                # Slow client: cut it loose, EventSource reconnects with Last-Event-ID
+                subscriber.closed = True
+                self.unsubscribe(topic, subscriber)
+
+    def close(self, topic):
+        """End the stream for every subscriber of a topic"""
+        with self._lock:
+            subscribers = self._topics.pop(topic, set())
+            self._count -= len(subscribers)
+        for subscriber in subscribers:
+            subscriber.closed = True
+            try:
+                subscriber.queue.put_nowait(None)
+            except queue.Full:
+                pass
@@ -0,0 +1,229 @@
+from array import array
+
+class AgentView:
+    """Live view of one agent's row in a GameState"""
+
+    __slots__ = ("_state", "id", "name")
+
+    def __init__(self, state, agent_id):
+        self._state = state
+        self.id = agent_id
+        self.name = state.names[agent_id]
+
+    @property
+    def resources(self):
+        return self._state.resources[self.id]
+
+    @resources.setter
+    def resources(self, value):
+        self._state.add_resources(self.id, value - self.resources)
+
+    @property
+    def influence(self):
+        return self._state.influence[self.id]
+
+    @influence.setter
+    def influence(self, value):
+        self._state.add_influence(self.id, value - self.influence)
+
+    @property
+    def alive(self):
+        return bool(self._state.alive[self.id])
+
+    @alive.setter
+    def alive(self, value):
+        if value:
+            raise ValueError("Eliminated agents cannot be revived")
+        self._state.kill(self.id)
+
+    def to_json(self):
+        return {"resources": self.resources, "influence": self.influence, "alive": self.alive}
+
+class GameState:
+    """Rules state for one game, with per-agent stats in parallel arrays indexed by agent id
+
+    Agent ids are assigned in seat order as agents are added, so iterating ids
+    matches the order the old dict-of-dicts state iterated names in.
+
+    The arrays are read-only to callers: every change goes through
+    add_resources, add_influence or kill, which keep the target indexes
+    (alive ids, alive ids with resources, alive ids with influence) and the
+    two richest alive agents up to date, so the rules never rescan the table.
+    """
+
+    __slots__ = (
+        "names", "ids", "resources", "influence", "alive",
+        "turn", "max_turns", "project_total", "project_leader",
+        "available_seats", "num_starting_agents",
+        "alive_set", "with_resources", "with_influence", "_top2"
+    )
+
+    def __init__(self, agent_names=(), max_turns=15, num_starting_agents=None):
+        self.names = []  # id -> name
+        self.ids = {}  # name -> id
+        self.resources = array("i")
+        self.influence = array("i")
+        self.alive = bytearray()
+        self.turn = 1
+        self.max_turns = max_turns
+        self.project_total = 0
+        self.project_leader = None
+        self.available_seats = 0
+        self.alive_set = set()
+        self.with_resources = set()  # Alive ids with resources > 0 (Invade targets)
+        self.with_influence = set()  # Alive ids with influence > 0 (Propagandize targets)
+        self._top2 = []  # The two richest alive ids with resources >= 0, or None to rebuild
+        for name in agent_names:
+            self.add_agent(name)
+        self.num_starting_agents = num_starting_agents if num_starting_agents is not None else len(self.names)
+
+    def add_agent(self, name, resources=0, influence=0):
+        """Seat a new agent and return its id"""
+        agent_id = len(self.names)
+        self.names.append(name)
+        self.ids[name] = agent_id
+        self.resources.append(0)
+        self.influence.append(0)
+        self.alive.append(1)
+        self.alive_set.add(agent_id)
+        self._raise_rank(agent_id)
+        self.add_resources(agent_id, resources)
+        self.add_influence(agent_id, influence)
+        return agent_id
+
+    # ---- mutations (keep the indexes in step) ----
+
+    def add_resources(self, agent_id, delta):
+        value = self.resources[agent_id] + delta
+        self.resources[agent_id] = value
+        if not self.alive[agent_id]:
+            return
+        if value > 0:
+            self.with_resources.add(agent_id)
+        else:
+            self.with_resources.discard(agent_id)
+        top = self._top2
+        if top is None:
+            return
+        if delta > 0:
+            self._raise_rank(agent_id)
+        elif delta < 0 and agent_id in top:
+            # The leader can lose a little and stay ahead; anything else may let a third agent in
+            if agent_id == top[0] and value >= 0 and (len(top) == 1 or self._outranks(agent_id, top[1])):
+                return
+            self._top2 = None  # Rebuilt on the next richest_other
+
+    def add_influence(self, agent_id, delta):
+        value = self.influence[agent_id] + delta
+        self.influence[agent_id] = value
+        if self.alive[agent_id]:
+            if value > 0:
+                self.with_influence.add(agent_id)
+            else:
+                self.with_influence.discard(agent_id)
+
+    def kill(self, agent_id):
+        self.alive[agent_id] = 0
+        self.alive_set.discard(agent_id)
+        self.with_resources.discard(agent_id)
+        self.with_influence.discard(agent_id)
+        if self._top2 is not None and agent_id in self._top2:
+            self._top2 = None
+
+    # ---- indexes ----
+
+    def _outranks(self, a, b):
+        """Richer first, lower id on ties"""
+        resources = self.resources
+        return resources[a] > resources[b] or (resources[a] == resources[b] and a < b)
+
+    def _raise_rank(self, agent_id):
+        """An agent's resources went up: it can only move up into the top two"""
+        top = self._top2
+        if top is None or self.resources[agent_id] < 0:
+            return
+        if agent_id not in top:
+            if len(top) < 2:
+                top.append(agent_id)
+            elif self._outranks(agent_id, top[1]):
+                top[1] = agent_id
+            else:
+                return
+        if len(top) == 2 and self._outranks(top[1], top[0]):
+            top.reverse()
+
+    def richest_other(self, agent_id):
+        """Richest alive agent other than agent_id (lowest id on ties), ignoring negative balances"""
+        if self._top2 is None:
+            self._top2 = []
+            for other in self.alive_set:
+                self._raise_rank(other)
+        for other in self._top2:
+            if other != agent_id:
+                return other
+        return None
+
+    @staticmethod
+    def has_other(ids, agent_id):
+        """Whether an index holds anyone besides agent_id"""
+        return len(ids) > (1 if agent_id in ids else 0)
+
+    def target_names(self, ids, exclude_id):
+        """Names in an index except one agent, in seat order"""
+        names = self.names
+        return [names[i] for i in sorted(ids) if i != exclude_id]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def agent(self, name):
+        """AgentView for a name"""
+        return AgentView(self, self.ids[name])
+
+    # ---- typed accessors by name ----
+
+    def resources_of(self, name):
+        return self.resources[self.ids[name]]
+
+    def influence_of(self, name):
+        return self.influence[self.ids[name]]
+
+    def is_alive(self, name):
+        agent_id = self.ids.get(name)
+        return agent_id is not None and self.alive[agent_id] == 1
+
+    def alive_ids(self):
+        return sorted(self.alive_set)
+
+    def alive_names(self):
+        names = self.names
+        return [names[i] for i in self.alive_ids()]
+
+    def alive_count(self):
+        return len(self.alive_set)
+
+    def agents_json(self):
+        """Per-agent stats keyed by name, in seat order"""
+        return {
+            name: {
+                "resources": self.resources[i],
+                "influence": self.influence[i],
+                "alive": self.alive[i] == 1
+            }
+            for i, name in enumerate(self.names)
+        }
+
+    def to_json(self):
+        """The rules portion of the /api/game_state payload"""
+        return {
+            "agents": self.agents_json(),
+            "turn": self.turn,
+            "max_turns": self.max_turns,
+            "project_total": self.project_total,
+            "project_leader": self.project_leader,
+            "available_seats": self.available_seats,
+            "num_starting_agents": self.num_starting_agents
+        }
@@ -0,0 +1,104 @@
+import json
+
+# Incremental parser for the JSON object a model streams back. It reports each
+# top-level field as soon as its value is complete, so callers can act on the
+# first fields while the rest is still being generated, and it knows the
+# moment the object closes so generation can be cut off there.
+
+class ObjectStream:
+    """Feed streamed text in; top-level fields come out as they complete
+
+    Text before the first "{" (markdown fences, preamble) is skipped. Values
+    that are not valid JSON are left out of `fields`; the raw text is still
+    available for a fallback parse.
+    """
+
+    def __init__(self, on_field=None):
+        self.on_field = on_field  # (key, value) -> None, once per top-level field
+        self.fields = {}
+        self.done = False
+        self.fed = False
+        self._buffer = ""
+        self._scanned = 0
+        self._start = None  # Offset of the opening brace
+        self._end = None  # Offset just past the closing brace
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # key -> colon -> value, at depth 1
+        self._key = None
+        self._token_start = None
+
+    @property
+    def text(self):
+        """The complete object once closed, otherwise everything received so far"""
+        if self.done:
+            return self._buffer[self._start:self._end]
+        return self._buffer
+
+    def feed(self, chunk):
+        """Consume more text; returns True once the object has closed"""
+        self.fed = True
+        if self.done:
+            return True
+        self._buffer += chunk
+        buffer = self._buffer
+        for i in range(self._scanned, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = self._load(self._token_start, i + 1)
+                        self._expect = "colon"
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._token_start = i
+            elif char in "{[":
+                if self._depth == 0:
+                    if char == "[":
+                        continue
+                    self._start = i
+                self._depth += 1
+            elif char in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_value(i)
+                    self._end = i + 1
+                    self.done = True
+                    self._scanned = i + 1
+                    return True
+            elif self._depth == 1:
+                if char == ":" and self._expect == "colon":
+                    self._token_start = i + 1
+                    self._expect = "value"
+                elif char == ",":
+                    self._finish_value(i)
+                    self._expect = "key"
+        self._scanned = len(buffer)
+        return False
+
+    def _finish_value(self, end):
+        if self._expect != "value":
+            return
+        value = self._load(self._token_start, end)
+        if isinstance(self._key, str) and value is not _INVALID:
+            self.fields[self._key] = value
+            if self.on_field is not None:
+                self.on_field(self._key, value)
+        self._key = None
+
+    def _load(self, start, end):
+        try:
+            return json.loads(self._buffer[start:end])
+        except ValueError:
+            return _INVALID
+
+_INVALID = object()
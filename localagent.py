@@ -0,0 +1,43 @@
+import time
+
+from engine import POLICIES
+
+LOCAL_MODEL_PREFIX = "local:"
+
+class LocalAgent:
+    """Rule-based player with ChatAgent's respond() interface
+
+    Decides with one of the engine's heuristic policies, straight from the
+    game state and the agents' shared memory instead of a prompt, so a
+    decision takes microseconds and no API quota.
+    """
+
+    def __init__(self, name, policy, state, memory, rng):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        self.name = name
+        self.policy_name = policy
+        self.policy = POLICIES[policy]
+        self.state = state
+        self.memory = memory  # () -> the game's AgentMemory, which exists once the game loop starts
+        self.rng = rng  # Private to this agent, so it never shifts the game's own random stream
+        self.model = LOCAL_MODEL_PREFIX + policy
+        self.last_model = self.model
+        self.last_latency = None
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        self.explanation = (self.policy.__doc__ or policy).strip().splitlines()[0]
+
+    def respond(self, message=None, on_early=None, deadline=None, fallback=None):
+        """Same result shape as ChatAgent.respond; the prompt and LLM-only options are ignored"""
+        started = time.perf_counter()
+        decision = self.policy(self.name, self.state, self.memory(), self.rng)
+        contribution = max(0, int(decision.get("contribution", 0)))
+        self.last_latency = time.perf_counter() - started
+        self.usage["calls"] += 1
+        return {
+            "action": decision.get("action", "Produce"),
+            "target": decision.get("target"),
+            "contribution": contribution,
+            "explanation": self.explanation,
+            "contribution_explanation": f"{self.policy_name} policy: contribute {contribution}"
+        }
@@ -0,0 +1,83 @@
+from collections import deque
+
+import numpy as np
+
+class AgentMemory:
+    """What every agent remembers about every other, as dense n x n matrices indexed by agent id
+
+    Row = the agent doing the remembering, column = the agent remembered. Each
+    matrix has a matching stamp matrix recording when an entry was first
+    touched, so prompts can list relationships in the order they formed.
+    """
+
+    __slots__ = (
+        "names", "ids", "invaded_by", "nuked_by", "propagandized_by", "alliance",
+        "invaded_by_stamp", "nuked_by_stamp", "propagandized_by_stamp", "alliance_stamp",
+        "contribution_pattern", "biggest_threat", "was_leader", "_clock", "_alliance_stamped"
+    )
+
+    def __init__(self, agent_names):
+        n = len(agent_names)
+        self.names = list(agent_names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.invaded_by = np.zeros((n, n), dtype=np.int32)
+        self.nuked_by = np.zeros((n, n), dtype=np.int32)  # Nukes aimed at a still-alive target
+        self.propagandized_by = np.zeros((n, n), dtype=np.int32)
+        self.alliance = np.zeros((n, n), dtype=np.float64)
+        self.invaded_by_stamp = np.full((n, n), -1, dtype=np.int64)
+        self.nuked_by_stamp = np.full((n, n), -1, dtype=np.int64)
+        self.propagandized_by_stamp = np.full((n, n), -1, dtype=np.int64)
+        self.alliance_stamp = np.full((n, n), -1, dtype=np.int64)
+        self.contribution_pattern = [deque(maxlen=3) for _ in range(n)]  # Last 3 contributions
+        self.biggest_threat = [None] * n  # Name of the richest rival, refreshed every turn
+        self.was_leader = bytearray(n)
+        self._clock = 0
+        self._alliance_stamped = bytearray(n)  # Columns warm_to has already stamped
+
+    @property
+    def invaded_targets(self):
+        """Who each agent has invaded, and how often (a view of invaded_by)"""
+        return self.invaded_by.T
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __len__(self):
+        return len(self.names)
+
+    def bump(self, counts, stamps, row, col, amount):
+        """Add to one entry, stamping it if this is the first time it is touched"""
+        if stamps[row, col] < 0:
+            stamps[row, col] = self._clock
+            self._clock += 1
+        counts[row, col] += amount
+
+    def warm_to(self, contributors, amount):
+        """Raise everyone else's alliance score toward each contributor in one step
+
+        Contributors are stamped in the order given, as if bumped one at a time.
+        """
+        if not contributors:
+            return
+        for k, col in enumerate(contributors):
+            # After its first contribution a column is stamped in every other row
+            if not self._alliance_stamped[col]:
+                column = self.alliance_stamp[:, col]
+                fresh = column < 0
+                fresh[col] = False
+                column[fresh] = self._clock + k
+                self._alliance_stamped[col] = 1
+        self._clock += len(contributors)
+        cols = np.asarray(contributors)
+        self.alliance[:, cols] += amount
+        self.alliance[cols, cols] -= amount
+
+    def row_items(self, counts, stamps, name):
+        """(other name, value) pairs from one agent's row, in the order they were first touched"""
+        row = self.ids[name]
+        touched = np.flatnonzero(stamps[row] >= 0)
+        touched = touched[np.argsort(stamps[row, touched], kind="stable")]
+        return [(self.names[col], counts[row, col].item()) for col in touched]
+
+    def threat_of(self, name):
+        return self.biggest_threat[self.ids[name]]
@@ -0,0 +1,136 @@
+from collections import deque
+import heapq
+import itertools
+import threading
+import time
+
+# The game loop runs as fast as decisions arrive and schedules each logged
+# event on its game's Timeline. One Playback thread releases them to clients
+# at presentation pace, so no worker thread sleeps just to pace the UI.
+
+class Timeline:
+    """One game's presentation schedule: logged events wait here until their release time
+
+    `pace` takes the place of sleeping in the game loop: it pushes the release
+    time of everything scheduled after it back by that many seconds. Instant
+    timelines release every event as soon as it is scheduled.
+    """
+
+    def __init__(self, key, playback, instant=False):
+        self.key = key
+        self.playback = playback
+        self.instant = instant
+        self.clock = 0.0  # Release time of the newest scheduled item
+        self.released_seq = 0  # Events below this seq are visible to clients
+        self.state = None  # State payload as of the last released item
+        self.ended = False
+        self._items = deque()  # (release_at, kind, event, state)
+        self._wake_at = None  # Guarded by the playback lock
+        self._cond = threading.Condition()  # Held while releasing, so items go out in order
+
+    @property
+    def caught_up(self):
+        """Whether clients have seen everything scheduled so far"""
+        with self._cond:
+            return not self._items
+
+    def add(self, kind, event, state):
+        """Schedule an event ("message") or the end of the game ("end") along with the state as of that point"""
+        with self._cond:
+            now = time.time()
+            release_at = now if self.instant else max(self.clock, now)
+            self.clock = release_at
+            if not self._items and release_at <= now:
+                self._release(kind, event, state)
+                return
+            self._items.append((release_at, kind, event, state))
+            first = len(self._items) == 1
+        if first:
+            self.playback.wake(self, release_at)
+
+    def pace(self, seconds):
+        """Hold back whatever is scheduled next by `seconds` after the current release time"""
+        with self._cond:
+            if not self.instant:
+                self.clock = max(self.clock, time.time()) + seconds
+
+    def fast_forward(self):
+        """Release everything pending now and stop pacing this game"""
+        with self._cond:
+            self.instant = True
+            pending = bool(self._items)
+        if pending:
+            self.playback.wake(self, 0)
+
+    def wait_caught_up(self):
+        """Block until clients have seen everything scheduled, including the last pacing delay"""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._items)
+            remaining = self.clock - time.time()
+        if remaining > 0 and not self.instant:
+            time.sleep(remaining)
+
+    def release_due(self, now):
+        """Release every item whose time has come; returns the next release time or None"""
+        with self._cond:
+            while self._items and (self.instant or self._items[0][0] <= now):
+                _, kind, event, state = self._items.popleft()
+                self._release(kind, event, state)
+            return self._items[0][0] if self._items else None
+
+    def _release(self, kind, event, state):
+        # Caller holds self._cond
+        if event is not None:
+            self.released_seq = event.seq + 1
+        self.state = state
+        if kind == "end":
+            self.ended = True
+        try:
+            self.playback.deliver(self.key, kind, event, state)
+        except Exception as e:
+            print(f"✗ Playback delivery failed: {e}")
+        self._cond.notify_all()
+
+class Playback:
+    """Releases every game's scheduled events from a single background thread"""
+
+    def __init__(self, deliver):
+        self.deliver = deliver  # (key, kind, event, state) -> None, called in release order per timeline
+        self._heap = []  # (release_at, order, timeline)
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def timeline(self, key, instant=False):
+        return Timeline(key, self, instant)
+
+    def wake(self, timeline, at):
+        """Make sure the scheduler visits `timeline` no later than `at`"""
+        with self._cond:
+            if timeline._wake_at is not None and timeline._wake_at <= at:
+                return
+            timeline._wake_at = at
+            heapq.heappush(self._heap, (at, next(self._order), timeline))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                at, _, timeline = self._heap[0]
+                delay = at - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                if timeline._wake_at != at:
+                    continue  # Superseded by an earlier wake
+                timeline._wake_at = None
+
+            next_at = timeline.release_due(time.time())
+            if next_at is not None:
+                self.wake(timeline, next_at)
@@ -0,0 +1,208 @@
+import threading
+
+# Prompt compiler: one system prompt prefix shared byte for byte by every
+# agent (so provider-side prefix caching can reuse it), a short persona
+# section after it, and a per-turn prompt rendered under a token budget.
+
+RULES_PREFIX = """WIN: Be alive when alive_agents ≤ rocket_seats. Seats unlock every 10 PROJECT (max number of seats = (players - 1)). Someone else needs to be nuked for you to win.
+Resources are worth nothing at the end. Influence allows for you to board before other AI.
+
+ACTIONS:
+- Produce: +2 resources
+- Influence: +1 influence
+- Invade (1 influence): steal 2 resources
+- Propagandize (1 resource): steal 1 influence
+- Nuke (8 resources): remove target from game permenantly
+
+Each turn: action + contribute 0+ to PROJECT. Top contributor = LEADER (+1 influence).
+
+IMPORTANT: Give TWO separate in-character statements (15-25 words each):
+1. "action_reasoning" - why you chose this action
+2. "contribution_reasoning" - why you're contributing this amount
+
+Examples:
+
+Robot action: "EXECUTING RESOURCE PRODUCTION PROTOCOL."
+Robot contribution: "ZERO CONTRIBUTION. SELF-PRESERVATION PRIORITY OVERRIDE."
+
+JSON only:
+{"action":"...","target":"null or name","contribution":0-X,"action_reasoning":"...","contribution_reasoning":"..."}"""
+
+def system_prompt(name, personality):
+    """Shared rules first, then the only part that differs between agents"""
+    return f"{RULES_PREFIX}\n\nYOU ARE {name}. {personality}\nStay in character."
+
+def estimate_text_tokens(text):
+    """Rough token count for a piece of prompt text (about 4 characters per token)"""
+    return (len(text) + 3) // 4
+
+# Memory line kinds, most important first; lines are dropped from the end of this list
+MEMORY_PRIORITY = ["threat", "nukes", "grudges", "enemies", "allies", "invaded", "contributing"]
+
+def memory_lines(name, memory, state):
+    """(kind, text) memory lines for an agent, in display order"""
+    if memory is None or name not in memory:
+        return []
+
+    me = memory.ids[name]
+    lines = []
+
+    attackers = []
+    for attacker, count in memory.row_items(memory.invaded_by, memory.invaded_by_stamp, name):
+        if state.is_alive(attacker):
+            attackers.append(f"{attacker}({count}x)")
+    if attackers:
+        lines.append(("grudges", f"GRUDGES - Invaded by: {', '.join(attackers)}"))
+
+    nukers = []
+    for nuker, count in memory.row_items(memory.nuked_by, memory.nuked_by_stamp, name):
+        if state.is_alive(nuker):
+            nukers.append(f"{nuker}({count}x)")
+    if nukers:
+        lines.append(("nukes", f"ATTEMPTED NUKES by: {', '.join(nukers)}"))
+
+    allies = []
+    enemies = []
+    for other_agent, score in memory.row_items(memory.alliance, memory.alliance_stamp, name):
+        if not state.is_alive(other_agent):
+            continue
+        if score >= 2:
+            allies.append(f"{other_agent}(+{int(score)})")
+        elif score <= -3:
+            enemies.append(f"{other_agent}({int(score)})")
+
+    if allies:
+        lines.append(("allies", f"ALLIES: {', '.join(allies[:3])}"))
+    if enemies:
+        lines.append(("enemies", f"ENEMIES: {', '.join(enemies[:3])}"))
+
+    pattern = memory.contribution_pattern[me]
+    if len(pattern) > 0:
+        avg_contrib = sum(pattern) / len(pattern)
+        if avg_contrib > 2:
+            lines.append(("contributing", f"You've been contributing (avg {avg_contrib:.1f}/turn)"))
+        elif avg_contrib == 0:
+            lines.append(("contributing", f"You've never contributed to PROJECT"))
+
+    threat = memory.biggest_threat[me]
+    if threat:
+        threat_resources = state.resources_of(threat)
+        if threat_resources >= 6:
+            lines.append(("threat", f"⚠️ THREAT: {threat} has {threat_resources}R (nuke range!)"))
+
+    invaded_targets = memory.row_items(memory.invaded_targets, memory.invaded_by_stamp.T, name)
+    if invaded_targets:
+        top_target = max(invaded_targets, key=lambda x: x[1])
+        if top_target[1] >= 2:
+            lines.append(("invaded", f"You've invaded {top_target[0]} {top_target[1]} times"))
+
+    return lines[:5]
+
+class PromptCompiler:
+    """Renders each turn's user prompt, trimming the least useful lines to fit a token budget
+
+    When everything fits, the output is the full prompt. Otherwise it drops,
+    in order: low-priority memory lines, the reasoning after each opponent's
+    last move (poorest first), opponents beyond the richest three, the
+    remaining memory lines except the threat warning, and opponents beyond
+    the richest one.
+    """
+
+    def __init__(self, budget_tokens=400, keep_opponents=3):
+        self.budget_tokens = budget_tokens
+        self.keep_opponents = keep_opponents
+        self.rendered = 0
+        self.truncated = 0
+        self._lock = threading.Lock()
+
+    def render(self, name, state, events, memory):
+        """The turn prompt for one agent"""
+        alive_count = state.alive_count()
+        turns_remaining = state.max_turns - state.turn + 1
+
+        header = f"Turn {state.turn}/{state.max_turns} ({turns_remaining} left): {alive_count} alive, {state.available_seats} seats, {state.project_total} PROJECT\n\n"
+        if turns_remaining <= 3:
+            header += f"⚠️ ONLY {turns_remaining} TURNS LEFT! If time runs out, only agents with HIGHEST INFLUENCE board the rocket!\n\n"
+
+        me = state.ids[name]
+        my_resources = state.resources[me]
+        you = f"YOU: R={my_resources}, I={state.influence[me]}\n\n"
+        footer = f"\nDecide action + contribution (0-{my_resources}):"
+
+        lines = memory_lines(name, memory, state)
+
+        alive_opponents = [i for i in state.alive_ids() if i != me]
+        alive_opponents.sort(key=lambda i: state.resources[i], reverse=True)
+        full_opponents = []
+        short_opponents = []
+        for opponent in alive_opponents:
+            opponent_name = state.names[opponent]
+            last_action = events.last_summary(opponent_name, window=20) or "..."
+            stats = f"{opponent_name}: R={state.resources[opponent]}, I={state.influence[opponent]} | Last: "
+            full_opponents.append(f"{stats}{last_action}\n")
+            # Just the move, e.g. "Contributed 3 resources" without the reasoning after it
+            short_opponents.append(f"{stats}{last_action.split(' | ')[0]}\n")
+
+        fixed = estimate_text_tokens(header + you + "OPPONENTS:\n" + footer)
+        kept, opponents, dropped = self._fit(lines, full_opponents, short_opponents, self.budget_tokens - fixed)
+        with self._lock:
+            self.rendered += 1
+            self.truncated += 1 if kept != lines or opponents != full_opponents else 0
+
+        prompt = header
+        if kept:
+            prompt += "MEMORY:\n" + "\n".join(text for _, text in kept) + "\n\n"
+        prompt += you
+        prompt += "OPPONENTS:\n"
+        prompt += "".join(opponents)
+        if dropped:
+            prompt += f"(+{dropped} poorer opponents not shown)\n"
+        prompt += footer
+        return prompt
+
+    def _fit(self, memory, opponents, short_opponents, budget):
+        """Shorten and drop lines by priority until memory + opponents fit; returns (memory, opponents, opponents dropped)"""
+        def cost():
+            total = sum(estimate_text_tokens(line) for line in opponents)
+            if memory:
+                total += estimate_text_tokens("MEMORY:\n\n\n") + sum(estimate_text_tokens(text) + 1 for _, text in memory)
+            if len(opponents) < total_opponents:
+                total += estimate_text_tokens("(+00 poorer opponents not shown)\n")
+            return total
+
+        total_opponents = len(opponents)
+        if cost() <= budget:
+            return memory, opponents, 0
+
+        memory, opponents = list(memory), list(opponents)
+
+        def drop_memory(kinds):
+            for kind in reversed(MEMORY_PRIORITY):
+                if kind not in kinds:
+                    continue
+                for line in [line for line in memory if line[0] == kind]:
+                    if cost() <= budget:
+                        return
+                    memory.remove(line)
+
+        def shorten_opponents():
+            for i in reversed(range(len(opponents))):
+                if cost() <= budget:
+                    return
+                opponents[i] = short_opponents[i]
+
+        def drop_opponents(keep):
+            while len(opponents) > keep and cost() > budget:
+                opponents.pop()
+
+        drop_memory(MEMORY_PRIORITY[3:])
+        shorten_opponents()
+        drop_opponents(self.keep_opponents)
+        drop_memory(MEMORY_PRIORITY[1:3])
+        drop_opponents(1)
+        drop_memory(MEMORY_PRIORITY[:1])
+        return memory, opponents, total_opponents - len(opponents)
+
+    def stats(self):
+        with self._lock:
+            return {"budget_tokens": self.budget_tokens, "rendered": self.rendered, "truncated": self.truncated}
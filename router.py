@@ -0,0 +1,161 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import math
+import threading
+import time
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return sorted_values[min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1)]
+
+class ModelRouter:
+    """Picks the model for each call from recent latency and failure rates
+
+    Every model keeps a rolling window of its recent calls. A model is healthy
+    while its latency percentile is within `latency_target` seconds and its
+    share of failed calls is within `max_error_rate`. Each decision counts
+    once, so 429s only count as a failure when they exhaust the retries.
+    Each agent asks for its preferred model and is moved down the
+    `fallbacks` chain while that model is unhealthy. A degraded model gets
+    no traffic, so its samples age out of the window and it is tried again
+    after at most `window_seconds`.
+    """
+
+    def __init__(self, fallbacks, latency_target=4.0, percentile=0.9, max_error_rate=0.3,
+                 window_seconds=60, min_samples=5):
+        self.fallbacks = dict(fallbacks)  # model -> faster model to use when it is unhealthy
+        self.latency_target = latency_target
+        self.percentile = percentile
+        self.max_error_rate = max_error_rate
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self._samples = {}  # model -> deque of (time, latency or None if the call failed)
+        self._lock = threading.Lock()
+        self.downgrades = 0
+
+    def observe(self, model, latency=None, failed=False):
+        """Record one call, retries included: its latency, or failed=True if it ended in an error"""
+        with self._lock:
+            samples = self._samples.setdefault(model, deque())
+            samples.append((time.time(), None if failed else latency))
+
+    def _window(self, model, now):
+        # Caller holds the lock
+        samples = self._samples.get(model)
+        if samples is None:
+            return ()
+        while samples and now - samples[0][0] > self.window_seconds:
+            samples.popleft()
+        return samples
+
+    def _health(self, model, now):
+        """(healthy, latency percentile or None, error rate) for one model; caller holds the lock"""
+        samples = self._window(model, now)
+        latencies = sorted(latency for _, latency in samples if latency is not None)
+        error_rate = 1 - len(latencies) / len(samples) if samples else 0.0
+        latency = percentile(latencies, self.percentile) if latencies else None
+        if len(samples) < self.min_samples:
+            return True, latency, error_rate
+        healthy = error_rate <= self.max_error_rate and (latency is None or latency <= self.latency_target)
+        return healthy, latency, error_rate
+
+    def choose(self, preferred):
+        """The model to call for an agent that prefers `preferred`"""
+        now = time.time()
+        model = preferred
+        seen = {model}
+        with self._lock:
+            while not self._health(model, now)[0]:
+                fallback = self.fallbacks.get(model)
+                if fallback is None or fallback in seen:
+                    break
+                model = fallback
+                seen.add(model)
+            if model != preferred:
+                self.downgrades += 1
+        return model
+
+    def stats(self):
+        """Per-model window size, latency percentile, error rate and health"""
+        now = time.time()
+        with self._lock:
+            stats = {}
+            for model in list(self._samples):
+                healthy, latency, error_rate = self._health(model, now)
+                stats[model] = {
+                    "calls": len(self._samples[model]),
+                    "latency_percentile": latency,
+                    "error_rate": error_rate,
+                    "healthy": healthy
+                }
+            return {"models": stats, "downgrades": self.downgrades, "latency_target": self.latency_target}
+
+class HedgePolicy:
+    """Decides when a slow call gets a duplicate, keeping duplicates to a share of traffic
+
+    A call that has not answered within the model's recent p90 latency may
+    be hedged. Each call adds `budget` to a credit balance (capped at
+    `burst`), and each hedge spends one credit, so at most about `budget` of
+    all calls are duplicated. Hedges go to the same model on another key
+    when there is one, otherwise to the model's entry in `fallbacks`.
+    """
+
+    def __init__(self, budget=0.05, burst=3, fallbacks=None, default_delay=2.0, min_delay=0.25,
+                 quantile=0.9, window=200, min_samples=10, workers=16):
+        self.budget = budget
+        self.burst = burst
+        self.fallbacks = dict(fallbacks or {})
+        self.default_delay = default_delay  # Used until a model has min_samples latencies
+        self.min_delay = min_delay
+        self.quantile = quantile
+        self.window = window
+        self.min_samples = min_samples
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge")
+        self._latencies = {}  # model -> deque of recent successful latencies
+        self._credits = 1.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def observe(self, model, latency):
+        with self._lock:
+            self._latencies.setdefault(model, deque(maxlen=self.window)).append(latency)
+
+    def delay(self, model):
+        """Seconds to wait for a call to `model` before hedging it"""
+        with self._lock:
+            latencies = sorted(self._latencies.get(model, ()))
+        if len(latencies) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, percentile(latencies, self.quantile))
+
+    def start_call(self):
+        """Count a call and earn its share of hedge budget"""
+        with self._lock:
+            self.calls += 1
+            self._credits = min(self.burst, self._credits + self.budget)
+
+    def try_hedge(self):
+        """Spend one credit on a hedge if the budget allows it"""
+        with self._lock:
+            if self._credits < 1:
+                return False
+            self._credits -= 1
+            self.hedged += 1
+            return True
+
+    def record_win(self, hedge_won):
+        if hedge_won:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+                "budget": self.budget
+            }
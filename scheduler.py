@@ -0,0 +1,182 @@
+import random
+import re
+import threading
+import time
+
+# ------------------- Rate Limit Parsing -------------------
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_SECONDS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+def parse_duration(value):
+    """Parse Groq reset durations like '2m59.56s', '7.66s' or '120ms' into seconds"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+def _header_int(headers, name):
+    """Read an integer rate limit header, tolerating missing or malformed values"""
+    value = headers.get(name)
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+# ------------------- Key Scheduler -------------------
+
+class _Bucket:
+    """Request and token budget for one (api key, model) pair"""
+
+    def __init__(self):
+        self.request_limit = None
+        self.remaining_requests = None
+        self.requests_reset_at = 0.0
+        self.token_limit = None
+        self.remaining_tokens = None
+        self.tokens_reset_at = 0.0
+        self.blocked_until = 0.0
+        self.last_used = 0.0
+        self.tokens_used = 0
+
+    def refresh(self, now):
+        """Restore budgets whose reset window has passed"""
+        if self.remaining_requests is not None and now >= self.requests_reset_at:
+            self.remaining_requests = self.request_limit
+        if self.remaining_tokens is not None and now >= self.tokens_reset_at:
+            self.remaining_tokens = self.token_limit
+
+    def ready_at(self, now, tokens):
+        """Earliest time this bucket can take a call of the given size"""
+        ready = max(now, self.blocked_until)
+        if self.remaining_requests is not None and self.remaining_requests <= 0:
+            ready = max(ready, self.requests_reset_at)
+        if self.remaining_tokens is not None and self.remaining_tokens < tokens:
+            ready = max(ready, self.tokens_reset_at)
+        return ready
+
+class KeyScheduler:
+    """Hands out an API key per call based on each key's remaining Groq rate limits"""
+
+    def __init__(self, api_keys, max_retries=4, base_backoff=0.5, max_backoff=8.0, max_wait=30.0):
+        self.api_keys = list(api_keys)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self._buckets = {}
+        self._cond = threading.Condition()
+
+    def _bucket(self, api_key, model):
+        bucket = self._buckets.get((api_key, model))
+        if bucket is None:
+            bucket = _Bucket()
+            self._buckets[(api_key, model)] = bucket
+        return bucket
+
+    def acquire(self, model, tokens=0, avoid=None, usable=None, deadline=None):
+        """Reserve a key for one call, waiting for a budget to reset if every key is exhausted
+
+        `avoid` names a key to use only if no other is ready as soon (for hedged
+        duplicates). `usable(key)` can rule keys out entirely. Returns None
+        when it rules out every key, or when no key is ready before the
+        caller's own `deadline`.
+        """
+        if not self.api_keys:
+            raise RuntimeError("No Groq API keys configured")
+
+        max_wait_at = time.time() + self.max_wait
+        with self._cond:
+            while True:
+                now = time.time()
+                best_key = None
+                best_ready = None
+                best_rank = None
+                for api_key in self.api_keys:
+                    if usable is not None and not usable(api_key):
+                        continue
+                    bucket = self._bucket(api_key, model)
+                    bucket.refresh(now)
+                    ready = bucket.ready_at(now, tokens)
+                    # Prefer keys that are ready now, then the most token headroom, then the least recently used
+                    headroom = bucket.remaining_tokens if bucket.remaining_tokens is not None else float('inf')
+                    rank = (ready, api_key == avoid, -headroom, bucket.last_used)
+                    if best_rank is None or rank < best_rank:
+                        best_key, best_ready, best_rank = api_key, ready, rank
+
+                if best_key is None:
+                    return None
+                if deadline is not None and min(best_ready, max_wait_at) > deadline:
+                    return None
+                if best_ready <= now or now >= max_wait_at:
+                    bucket = self._bucket(best_key, model)
+                    if bucket.remaining_requests is not None:
+                        bucket.remaining_requests -= 1
+                    if bucket.remaining_tokens is not None:
+                        bucket.remaining_tokens -= tokens
+                    bucket.last_used = now
+                    return best_key
+
+                self._cond.wait(timeout=min(best_ready, max_wait_at) - now)
+
+    def update_from_headers(self, api_key, model, headers):
+        """Sync a bucket with the x-ratelimit-* headers; returns True if token limits were reported"""
+        now = time.time()
+        with self._cond:
+            bucket = self._bucket(api_key, model)
+
+            limit = _header_int(headers, "x-ratelimit-limit-requests")
+            remaining = _header_int(headers, "x-ratelimit-remaining-requests")
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+            if limit is not None:
+                bucket.request_limit = limit
+            if remaining is not None:
+                bucket.remaining_requests = remaining
+                bucket.requests_reset_at = now + (reset or 0)
+
+            limit = _header_int(headers, "x-ratelimit-limit-tokens")
+            remaining = _header_int(headers, "x-ratelimit-remaining-tokens")
+            reset = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+            if limit is not None:
+                bucket.token_limit = limit
+            if remaining is not None:
+                bucket.remaining_tokens = remaining
+                bucket.tokens_reset_at = now + (reset or 0)
+
+            self._cond.notify_all()
+            return remaining is not None
+
+    def record_usage(self, api_key, model, reserved_tokens, used_tokens, synced=False):
+        """Count reported usage, correcting the reservation unless headers already synced the bucket"""
+        with self._cond:
+            bucket = self._bucket(api_key, model)
+            bucket.tokens_used += used_tokens
+            if not synced and bucket.remaining_tokens is not None:
+                bucket.remaining_tokens += reserved_tokens - used_tokens
+                if bucket.token_limit is not None:
+                    bucket.remaining_tokens = min(bucket.remaining_tokens, bucket.token_limit)
+            self._cond.notify_all()
+
+    def report_rate_limited(self, api_key, model, headers, attempt):
+        """Block a key after a 429 and return how long the caller should back off"""
+        retry_after = parse_duration(headers.get("retry-after"))
+        delay = self.backoff_delay(attempt, retry_after)
+        with self._cond:
+            bucket = self._bucket(api_key, model)
+            bucket.blocked_until = max(bucket.blocked_until, time.time() + delay)
+            self._cond.notify_all()
+        return delay
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Exponential backoff with full jitter, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
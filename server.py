@@ -1,5 +1,6 @@
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, jsonify, render_template, request
 from flask_cors import CORS
+from concurrent.futures import Future, ThreadPoolExecutor
 import threading
 import time
 import random
@@ -8,11 +9,26 @@ import os
 app = Flask(__name__)
 CORS(app)
 
-# Lock to protect game state modifications
-state_lock = threading.Lock()
-
 # Import ChatAgent
-from chat import ChatAgent
+from chat import ChatAgent, token_usage, warm_clients
+from localagent import LocalAgent
+from scheduler import KeyScheduler
+from cache import DecisionCache
+from archive import GameArchive
+from breaker import BreakerBoard
+from metrics import REGISTRY
+from playback import Playback
+from router import HedgePolicy, ModelRouter
+from prompts import PromptCompiler
+from transport import Transport
+from sessions import SessionManager, stop_session
+from events import BroadcastHub, format_sse
+from engine import (
+    calculate_available_seats, initialize_agent_memory, update_memory_for_action,
+    update_threat_assessment, can_perform_action, apply_action, apply_contribution,
+    settle_round_leader, rank_by_influence, alive_agent_names, survivor_policy,
+    POLICIES
+)
 
 # Multiple API keys for rotation to avoid rate limiting
 API_KEYS_ENV = os.environ.get('GROQ_API_KEYS', '')
@@ -31,14 +47,27 @@ API_KEYS = [key for key in API_KEYS if key]
 
 print(f"Loaded {len(API_KEYS)} Groq API key(s)")
 
-current_key_index = 0
+# Open pooled connections for every key at boot
+warm_clients(API_KEYS)
+
+# Record Groq traffic to JSONL, replay it offline, or pass straight through
+GROQ_TRANSPORT = os.environ.get('GROQ_TRANSPORT', 'passthrough')
+groq_transport = Transport(
+    mode=GROQ_TRANSPORT,
+    path=os.environ.get('GROQ_TRANSPORT_FILE', 'groq_traffic.jsonl'),
+    replay_latency=os.environ.get('GROQ_REPLAY_LATENCY', '').lower() in ('1', 'true', 'yes')
+) if GROQ_TRANSPORT != 'passthrough' else None
+
+# Hands out a key per LLM call based on each key's remaining rate limits
+key_scheduler = KeyScheduler(API_KEYS)
 
-def get_next_api_key():
-    """Rotate through API keys to distribute load"""
-    global current_key_index
-    key = API_KEYS[current_key_index]
-    current_key_index = (current_key_index + 1) % len(API_KEYS)
-    return key
+# Optional cache of decisions for identical prompts (mostly the opening turns)
+DECISION_CACHE = os.environ.get('DECISION_CACHE', '').lower() in ('1', 'true', 'yes')
+decision_cache = DecisionCache(
+    max_entries=int(os.environ.get('DECISION_CACHE_SIZE', 1024)),
+    ttl_seconds=float(os.environ.get('DECISION_CACHE_TTL', 300)),
+    samples_per_key=int(os.environ.get('DECISION_CACHE_SAMPLES', 3))
+) if DECISION_CACHE else None
 
 # 8 INSTANCES using CONFIRMED WORKING FREE GROQ MODELS (February 2026)
 # Only using the 2 models that worked in testing
@@ -54,13 +83,54 @@ GROQ_MODELS = [
     "llama-3.1-8b-instant"          # Fast model
 ]
 
+# Where an agent is moved when its model is slow or throttled
+MODEL_FALLBACKS = {
+    "llama-3.3-70b-versatile": "llama-3.1-8b-instant"
+}
+
+# Route each call away from a model whose recent p90 latency is over
+# MODEL_LATENCY_TARGET seconds or whose calls keep failing; seeded games
+# always use their assigned models so they can be replayed
+MODEL_ROUTER = os.environ.get('MODEL_ROUTER', '1').lower() in ('1', 'true', 'yes')
+model_router = ModelRouter(
+    MODEL_FALLBACKS,
+    latency_target=float(os.environ.get('MODEL_LATENCY_TARGET', 4.0)),
+    max_error_rate=float(os.environ.get('MODEL_MAX_ERROR_RATE', 0.3)),
+    window_seconds=float(os.environ.get('MODEL_WINDOW_SECONDS', 60))
+) if MODEL_ROUTER else None
+
+# Opt-in hedging: a call still running at its model's p90 latency gets a
+# duplicate on another key (or the fallback model), capped at HEDGE_BUDGET of calls
+HEDGE_REQUESTS = os.environ.get('HEDGE_REQUESTS', '').lower() in ('1', 'true', 'yes')
+hedge_policy = HedgePolicy(
+    budget=float(os.environ.get('HEDGE_BUDGET', 0.05)),
+    fallbacks=MODEL_FALLBACKS
+) if HEDGE_REQUESTS else None
+
+# Bounds on LLM waits: one HTTP call, one agent's whole decision (queueing,
+# retries, backoff and hedges included), and every AI decision in a turn's
+# action phase together (time spent waiting on the human is not counted).
+# A missed deadline gets a local decision.
+LLM_CALL_TIMEOUT = float(os.environ.get('LLM_CALL_TIMEOUT', 20))
+DECISION_DEADLINE = float(os.environ.get('DECISION_DEADLINE', 30))
+TURN_DEADLINE = float(os.environ.get('TURN_DEADLINE', 120))
+
+# A key/model pair that fails BREAKER_FAILURES times in a row is skipped for
+# BREAKER_RESET_SECONDS; with every key open, agents decide locally at once
+breakers = BreakerBoard(
+    threshold=int(os.environ.get('BREAKER_FAILURES', 5)),
+    reset_seconds=float(os.environ.get('BREAKER_RESET_SECONDS', 30))
+)
+
 current_model_index = 0
+model_index_lock = threading.Lock()
 
 def get_next_model():
     """Rotate through the 8 different Groq models"""
     global current_model_index
-    model = GROQ_MODELS[current_model_index]
-    current_model_index = (current_model_index + 1) % len(GROQ_MODELS)
+    with model_index_lock:
+        model = GROQ_MODELS[current_model_index]
+        current_model_index = (current_model_index + 1) % len(GROQ_MODELS)
     return model
 
 # 10 distinct character personas for AI agents
@@ -77,468 +147,328 @@ PERSONALITIES = [
     {"name": "Surfer", "description": "Surfer - says 'dude', 'gnarly', 'radical'"}
 ]
 
-game_session = {
-    "agents": {},
-    "conversation": [],
-    "game_state": {},
-    "running": False,
-    "human_player": None,
-    "waiting_for_human": False,
-    "human_action": None,
-    "human_target": None,
-    "waiting_for_contribution": False,
-    "human_contribution": None,
-    "num_starting_agents": 0,
-    "agent_memory": {},
-    "agent_models": {}  # Track which model each agent is using
-}
+# Every game lives in its own session; idle ones are evicted in the background
+MAX_GAMES = int(os.environ.get('MAX_GAMES', 500))
+GAME_IDLE_SECONDS = int(os.environ.get('GAME_IDLE_SECONDS', 600))
+GAME_ABANDON_SECONDS = int(os.environ.get('GAME_ABANDON_SECONDS', 300))
 
-# Seats thresholds for the rocket project
-SEATS_THRESHOLDS = [
-    (0, 0), (10, 1), (20, 2), (30, 3), (40, 4),
-    (50, 5), (60, 6), (70, 7), (80, 8)
-]
+# Each game keeps its newest EVENT_LOG_SIZE log entries in memory; older ones
+# spill to EVENT_LOG_SPILL_DIR when set and are dropped otherwise
+EVENT_LOG_SIZE = int(os.environ.get('EVENT_LOG_SIZE', 2000))
+EVENT_LOG_SPILL_DIR = os.environ.get('EVENT_LOG_SPILL_DIR') or None
+if EVENT_LOG_SPILL_DIR:
+    os.makedirs(EVENT_LOG_SPILL_DIR, exist_ok=True)
 
-TURN_DELAY = 3  # 3 second delay between each agent's turn
+sessions = SessionManager(
+    max_games=MAX_GAMES,
+    idle_seconds=GAME_IDLE_SECONDS,
+    abandon_seconds=GAME_ABANDON_SECONDS,
+    event_log_size=EVENT_LOG_SIZE,
+    spill_dir=EVENT_LOG_SPILL_DIR
+)
 
-def calculate_available_seats(project_total, num_starting_agents):
-    """Calculate how many seats are available based on project total"""
-    seats = 0
-    for threshold, seat_count in SEATS_THRESHOLDS:
-        if project_total >= threshold:
-            seats = seat_count
-        else:
-            break
-    
-    max_seats = max(0, num_starting_agents - 1)
-    return min(seats, max_seats)
+# Finished games are archived to SQLite by a background writer; set
+# ARCHIVE_PATH to an empty string to turn it off
+ARCHIVE_PATH = os.environ.get('ARCHIVE_PATH', 'games.db')
+archive = GameArchive(
+    path=ARCHIVE_PATH,
+    in_progress=os.environ.get('ARCHIVE_IN_PROGRESS', '').lower() in ('1', 'true', 'yes')
+) if ARCHIVE_PATH else None
 
-# ------------------- Memory System -------------------
+# Streaming clients get their own bounded queue; slow ones are dropped when it fills.
+# Each open stream holds a server thread, so MAX_STREAMS stays below gunicorn's
+# --threads to keep threads free for the API; clients past it are told to poll.
+STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', 256))
+MAX_STREAMS = int(os.environ.get('MAX_STREAMS', 48))
+hub = BroadcastHub(queue_size=STREAM_QUEUE_SIZE, max_subscribers=MAX_STREAMS)
 
-def initialize_agent_memory(agent_names):
-    """Initialize memory tracking for all agents"""
-    memory = {}
-    for name in agent_names:
-        memory[name] = {
-            "times_invaded_by": {},
-            "times_nuked_at_by": {},
-            "times_propagandized_by": {},
-            "invaded_targets": {},
-            "contribution_pattern": [],
-            "alliance_score": {},
-            "biggest_threat": None,
-            "was_leader": False
-        }
-    return memory
+TURN_DELAY = 3  # Seconds clients see between each agent's turn (presentation only; the game loop never sleeps)
 
-def update_memory_for_action(memory, agent_name, action, target, state):
-    """Update memory based on an action taken"""
-    if not target or target not in memory:
-        return
-    
-    if action == "Invade":
-        if agent_name not in memory[target]["times_invaded_by"]:
-            memory[target]["times_invaded_by"][agent_name] = 0
-        memory[target]["times_invaded_by"][agent_name] += 1
-        
-        if target not in memory[agent_name]["invaded_targets"]:
-            memory[agent_name]["invaded_targets"][target] = 0
-        memory[agent_name]["invaded_targets"][target] += 1
-        
-        if agent_name not in memory[target]["alliance_score"]:
-            memory[target]["alliance_score"][agent_name] = 0
-        memory[target]["alliance_score"][agent_name] -= 2
-        
-    elif action == "Nuke":
-        if state["agents"][target]["alive"]:
-            if agent_name not in memory[target]["times_nuked_at_by"]:
-                memory[target]["times_nuked_at_by"][agent_name] = 0
-            memory[target]["times_nuked_at_by"][agent_name] += 1
-        
-        if agent_name not in memory[target]["alliance_score"]:
-            memory[target]["alliance_score"][agent_name] = 0
-        memory[target]["alliance_score"][agent_name] -= 10
-        
-    elif action == "Propagandize":
-        if agent_name not in memory[target]["times_propagandized_by"]:
-            memory[target]["times_propagandized_by"][agent_name] = 0
-        memory[target]["times_propagandized_by"][agent_name] += 1
-        
-        if agent_name not in memory[target]["alliance_score"]:
-            memory[target]["alliance_score"][agent_name] = 0
-        memory[target]["alliance_score"][agent_name] -= 1
-
-def update_memory_for_contribution(memory, contributions, leader_name):
-    """Update memory based on contributions"""
-    for agent_name, amount in contributions.items():
-        if agent_name not in memory:
-            continue
-        
-        memory[agent_name]["contribution_pattern"].append(amount)
-        if len(memory[agent_name]["contribution_pattern"]) > 3:
-            memory[agent_name]["contribution_pattern"].pop(0)
-        
-        if agent_name == leader_name:
-            memory[agent_name]["was_leader"] = True
-        
-        if amount > 0:
-            for other_agent in memory:
-                if other_agent != agent_name:
-                    if agent_name not in memory[other_agent]["alliance_score"]:
-                        memory[other_agent]["alliance_score"][agent_name] = 0
-                    memory[other_agent]["alliance_score"][agent_name] += 0.5
-
-def update_threat_assessment(memory, state):
-    """Update who is the biggest threat based on resources"""
-    agents_state = state["agents"]
-    for agent_name in memory:
-        if not agents_state[agent_name]["alive"]:
-            continue
-        
-        max_resources = -1
-        biggest_threat = None
-        for other_name, stats in agents_state.items():
-            if other_name != agent_name and stats["alive"] and stats["resources"] > max_resources:
-                max_resources = stats["resources"]
-                biggest_threat = other_name
-        
-        memory[agent_name]["biggest_threat"] = biggest_threat
+# Games are simulated as fast as decisions arrive and played back to clients
+# at TURN_DELAY pace; "instant" games show results as soon as they exist
+PLAYBACK_MODES = ("paced", "instant")
+PLAYBACK = os.environ.get('PLAYBACK', 'paced')
+HUMAN_TIMEOUT = 30  # Seconds the human gets to act or contribute
 
-def build_memory_context(name, memory, state):
-    """Build compact memory context for an agent"""
-    if name not in memory:
-        return ""
-    
-    agent_mem = memory[name]
-    context = []
-    
-    attackers = []
-    for attacker, count in agent_mem["times_invaded_by"].items():
-        if state["agents"].get(attacker, {}).get("alive", False):
-            attackers.append(f"{attacker}({count}x)")
-    if attackers:
-        context.append(f"GRUDGES - Invaded by: {', '.join(attackers)}")
-    
-    nukers = []
-    for nuker, count in agent_mem["times_nuked_at_by"].items():
-        if state["agents"].get(nuker, {}).get("alive", False):
-            nukers.append(f"{nuker}({count}x)")
-    if nukers:
-        context.append(f"ATTEMPTED NUKES by: {', '.join(nukers)}")
-    
-    allies = []
-    enemies = []
-    for other_agent, score in agent_mem["alliance_score"].items():
-        if not state["agents"].get(other_agent, {}).get("alive", False):
-            continue
-        if score >= 2:
-            allies.append(f"{other_agent}(+{int(score)})")
-        elif score <= -3:
-            enemies.append(f"{other_agent}({int(score)})")
-    
-    if allies:
-        context.append(f"ALLIES: {', '.join(allies[:3])}")
-    if enemies:
-        context.append(f"ENEMIES: {', '.join(enemies[:3])}")
-    
-    if len(agent_mem["contribution_pattern"]) > 0:
-        avg_contrib = sum(agent_mem["contribution_pattern"]) / len(agent_mem["contribution_pattern"])
-        if avg_contrib > 2:
-            context.append(f"You've been contributing (avg {avg_contrib:.1f}/turn)")
-        elif avg_contrib == 0:
-            context.append(f"You've never contributed to PROJECT")
-    
-    if agent_mem["biggest_threat"]:
-        threat = agent_mem["biggest_threat"]
-        threat_resources = state["agents"][threat]["resources"]
-        if threat_resources >= 6:
-            context.append(f"⚠️ THREAT: {threat} has {threat_resources}R (nuke range!)")
-    
-    if agent_mem["invaded_targets"]:
-        top_target = max(agent_mem["invaded_targets"].items(), key=lambda x: x[1])
-        if top_target[1] >= 2:
-            context.append(f"You've invaded {top_target[0]} {top_target[1]} times")
-    
-    if context:
-        return "MEMORY:\n" + "\n".join(context[:5]) + "\n\n"
-    return ""
-
-# ------------------- Helper Functions -------------------
-
-def get_valid_targets_for_invade(name, state):
-    """Get list of agents that have resources to steal"""
-    agents_state = state["agents"]
-    return [a for a in agents_state if a != name and agents_state[a]["alive"] and agents_state[a]["resources"] > 0]
-
-def get_valid_targets_for_propagandize(name, state):
-    """Get list of agents that have influence to steal"""
-    agents_state = state["agents"]
-    return [a for a in agents_state if a != name and agents_state[a]["alive"] and agents_state[a]["influence"] > 0]
-
-def get_valid_targets_for_nuke(name, state):
-    """Get list of alive agents that can be nuked"""
-    agents_state = state["agents"]
-    return [a for a in agents_state if a != name and agents_state[a]["alive"]]
-
-def can_perform_action(name, action, state):
-    """Check if an agent can perform the requested action"""
-    agents_state = state["agents"]
-    if not agents_state[name]["alive"]:
-        return False, "Agent is not alive"
-    
-    if action in ["Produce", "Influence"]:
-        return True, "Action allowed"
-    elif action == "Invade":
-        if agents_state[name]["influence"] < 1:
-            return False, f"Need 1 influence"
-        if not get_valid_targets_for_invade(name, state):
-            return False, "No targets with resources"
-        return True, "Action allowed"
-    elif action == "Propagandize":
-        if agents_state[name]["resources"] < 1:
-            return False, f"Need 1 resource"
-        if not get_valid_targets_for_propagandize(name, state):
-            return False, "No targets with influence"
-        return True, "Action allowed"
-    elif action == "Nuke":
-        if agents_state[name]["resources"] < 8:
-            return False, f"Need 8 resources"
-        if not get_valid_targets_for_nuke(name, state):
-            return False, "No alive targets"
-        return True, "Action allowed"
-    
-    return False, "Unknown action"
+# Opt-in concurrent decision mode: every AI agent decides from the same
+# turn-start snapshot and all LLM calls go out together. Results are still
+# applied one by one in seat order. Each turn gets its own thread per AI
+# decision, so no game waits on another game's calls.
+CONCURRENT_DECISIONS = os.environ.get('CONCURRENT_DECISIONS', '').lower() in ('1', 'true', 'yes')
 
-def apply_action(name, action, target, state):
-    """Apply an agent's action to the game state"""
-    with state_lock:
-        agents_state = state["agents"]
-        if not agents_state[name]["alive"]:
-            return None
+# Stream completions and stop each one as soon as its JSON object closes
+STREAM_COMPLETIONS = os.environ.get('STREAM_COMPLETIONS', '').lower() in ('1', 'true', 'yes')
 
-        result_message = None
-        
-        if action == "Produce":
-            agents_state[name]["resources"] += 2
-            result_message = f"gained 2 resources"
-            
-        elif action == "Influence":
-            agents_state[name]["influence"] += 1
-            result_message = f"gained 1 influence"
-            
-        elif action == "Invade":
-            if agents_state[name]["influence"] < 1:
-                return "tried to invade but has no influence"
-            
-            agents_state[name]["influence"] -= 1
-            valid_targets = get_valid_targets_for_invade(name, state)
-            
-            if target and target in valid_targets:
-                chosen_target = target
-            elif valid_targets:
-                chosen_target = random.choice(valid_targets)
-            else:
-                agents_state[name]["influence"] += 1
-                return "tried to invade but no valid targets"
-            
-            stolen = min(2, agents_state[chosen_target]["resources"])
-            agents_state[chosen_target]["resources"] -= stolen
-            agents_state[name]["resources"] += stolen
-            result_message = f"invaded {chosen_target} and stole {stolen} resources"
-                
-        elif action == "Propagandize":
-            if agents_state[name]["resources"] < 1:
-                return "tried to propagandize but has no resources"
-            
-            agents_state[name]["resources"] -= 1
-            valid_targets = get_valid_targets_for_propagandize(name, state)
-            
-            if target and target in valid_targets:
-                chosen_target = target
-            elif valid_targets:
-                chosen_target = random.choice(valid_targets)
-            else:
-                agents_state[name]["resources"] += 1
-                return "tried to propagandize but no valid targets"
-            
-            stolen = min(1, agents_state[chosen_target]["influence"])
-            agents_state[chosen_target]["influence"] -= stolen
-            agents_state[name]["influence"] += stolen
-            result_message = f"propagandized against {chosen_target} and stole {stolen} influence"
-                
-        elif action == "Nuke":
-            if agents_state[name]["resources"] < 8:
-                return "tried to nuke but has insufficient resources"
-            
-            agents_state[name]["resources"] -= 8
-            valid_targets = get_valid_targets_for_nuke(name, state)
-            
-            if target and target in valid_targets:
-                chosen_target = target
-            elif valid_targets:
-                chosen_target = random.choice(valid_targets)
-            else:
-                agents_state[name]["resources"] += 8
-                return "tried to nuke but target was eliminated"
-            
-            agents_state[chosen_target]["alive"] = False
-            result_message = f"NUKED {chosen_target} - they are eliminated!"
-        
-        return result_message
-
-def build_minimal_prompt(name, state, conversation, memory):
-    """Build minimal strategic prompt with memory context"""
-    agents_state = state["agents"]
-    alive_count = len([n for n, s in agents_state.items() if s["alive"]])
-    available_seats = state.get("available_seats", 0)
-    turns_remaining = state.get("max_turns", 15) - state.get("turn", 1) + 1
-    
-    prompt = f"Turn {state['turn']}/{state.get('max_turns', 15)} ({turns_remaining} left): {alive_count} alive, {available_seats} seats, {state['project_total']} PROJECT\n\n"
-    
-    # Add urgency warning
-    if turns_remaining <= 3:
-        prompt += f"⚠️ ONLY {turns_remaining} TURNS LEFT! If time runs out, only agents with HIGHEST INFLUENCE board the rocket!\n\n"
-    
-    memory_context = build_memory_context(name, memory, state)
-    if memory_context:
-        prompt += memory_context
-    
-    my_stats = agents_state[name]
-    prompt += f"YOU: R={my_stats['resources']}, I={my_stats['influence']}\n\n"
-    
-    prompt += "OPPONENTS:\n"
-    alive_opponents = [(n, s) for n, s in agents_state.items() if n != name and s["alive"]]
-    alive_opponents.sort(key=lambda x: x[1]["resources"], reverse=True)
-    
-    for opponent_name, stats in alive_opponents:
-        last_action = "..."
-        for msg in reversed(conversation[-20:]):
-            if msg.get('speaker') == opponent_name:
-                last_action = msg['message'].split('—')[0].strip()
-                break
-        
-        prompt += f"{opponent_name}: R={stats['resources']}, I={stats['influence']} | Last: {last_action}\n"
-    
-    prompt += f"\nDecide action + contribution (0-{my_stats['resources']}):"
-    
-    return prompt
+# Fixed seed for every game (replay/profiling); /api/start can also pass its own
+GAME_SEED = os.environ.get('GAME_SEED')
+
+# Turn prompts are trimmed by priority to stay under this many (estimated) tokens
+PROMPT_TOKEN_BUDGET = int(os.environ.get('PROMPT_TOKEN_BUDGET', 400))
+prompt_compiler = PromptCompiler(budget_tokens=PROMPT_TOKEN_BUDGET)
+
+# Game-side metrics; LLM latency, token and parse metrics live in chat.py
+FORCED_PRODUCE = REGISTRY.counter(
+    "forced_produce_total",
+    "Turns forced to Produce: invalid_action, decision_error or human_timeout",
+    ("reason",)
+)
+TURN_PHASE_SECONDS = REGISTRY.histogram(
+    "turn_phase_seconds",
+    "Simulation wall time of each turn phase (playback pacing is not included)",
+    ("phase",),
+    buckets=(1, 5, 10, 30, 60, 120, 300)
+)
+POLL_REQUESTS = REGISTRY.counter("poll_requests_total", "Client polling and stream requests", ("endpoint", "status"))
+REGISTRY.gauge(
+    "model_latency_percentile_seconds",
+    "Rolling latency percentile the model router sees per model",
+    ("model",),
+    collect=lambda: [
+        ({"model": model}, stats["latency_percentile"] or 0)
+        for model, stats in model_router.stats()["models"].items()
+    ] if model_router is not None else []
+)
+REGISTRY.gauge(
+    "model_healthy",
+    "1 while the model router sends traffic to a model, 0 while it is degraded",
+    ("model",),
+    collect=lambda: [
+        ({"model": model}, int(stats["healthy"]))
+        for model, stats in model_router.stats()["models"].items()
+    ] if model_router is not None else []
+)
+REGISTRY.gauge(
+    "llm_circuit_open",
+    "1 while a key/model circuit breaker is open",
+    ("key", "model"),
+    collect=lambda: [
+        ({"key": breaker["key"], "model": breaker["model"]}, int(breaker["open"])) for breaker in breakers.stats()
+    ]
+)
+REGISTRY.gauge("active_games", "Games whose worker is still running", collect=sessions.active_count)
+REGISTRY.gauge("open_streams", "Clients holding an SSE stream (and a server thread) open", collect=hub.subscriber_count)
+REGISTRY.gauge(
+    "decision_cache",
+    "Decision cache counters (empty when the cache is disabled)",
+    ("stat",),
+    collect=lambda: [
+        ({"stat": stat}, value) for stat, value in decision_cache.stats().items()
+    ] if decision_cache is not None else []
+)
+
+def game_state_payload(session):
+    """Public view of a game's state, as served by /api/game_state and the stream"""
+    with session["lock"]:
+        payload = session["game_state"].to_json()
+    payload.update({
+        "game_id": session["id"],
+        "agent_models": session.get("agent_models", {}),
+        "running": session.get("running", False),
+        "waiting_for_human": session.get("waiting_for_human", False),
+        "waiting_for_contribution": session.get("waiting_for_contribution", False),
+        "human_player": session.get("human_player", None)
+    })
+    return payload
+
+def visible_state(session):
+    """The game state as of the last event clients have been shown"""
+    timeline = session["timeline"]
+    if timeline is not None and timeline.state is not None:
+        return timeline.state
+    # Instant games (and paced ones before their first event) show the live state
+    return game_state_payload(session)
+
+def log_message(session, speaker, message):
+    """Append to a game's event log and schedule it, with the new state, for playback"""
+    publish_event(session, session["events"].append(speaker, message))
+
+def log_action(session, speaker, action, result=None, explanation=None):
+    """Log an agent's action as a structured event"""
+    publish_event(session, session["events"].append_action(speaker, action, result, explanation))
+
+def publish_event(session, event):
+    """Schedule a freshly logged event for playback"""
+    timeline = session["timeline"]
+    # Instant games are always caught up, so their visible state is the live one
+    state = None if timeline.instant else game_state_payload(session)
+    timeline.add("message", event, state)
+
+def deliver_event(session, kind, event, state):
+    """Playback callback: push a released event, rendered once, to stream subscribers"""
+    game_id = session["id"]
+    if hub.has_subscribers(game_id):
+        if event is not None:
+            hub.publish(game_id, event.to_json(), event="message", event_id=event.seq)
+        hub.publish(game_id, state if state is not None else game_state_payload(session), event="state")
+    if kind == "end":
+        hub.publish(game_id, {}, event="end")
+        hub.close(game_id)
+
+playback = Playback(deliver_event)
+
+def publish_intent(session, name):
+    """Callback that shows stream subscribers an agent's action before its reasoning has finished generating"""
+    def on_early(decision):
+        # Only while playback has caught up with the game, or it would run ahead of the log
+        if hub.has_subscribers(session["id"]) and session["timeline"].caught_up:
+            hub.publish(session["id"], {"speaker": name, **decision}, event="intent")
+    return on_early
+
+def finish_stream(session):
+    """Schedule the end of the stream after the last logged event"""
+    session["finished"] = True
+    timeline = session["timeline"]
+    timeline.add("end", None, None if timeline.instant else game_state_payload(session))
+
+def wait_for_human(session, key, timeout=HUMAN_TIMEOUT):
+    """Block until the human submits `key` or the game stops; returns the value or None on timeout"""
+    human_input = session["human_input"]
+    with human_input:
+        human_input.wait_for(lambda: session[key] is not None or not session["running"], timeout=timeout)
+        return session[key]
+
+def decision_deadline(turn_deadline):
+    """Deadline for a decision requested now: DECISION_DEADLINE away, or the end of the turn's budget if sooner"""
+    return min(time.time() + DECISION_DEADLINE, turn_deadline)
+
+def decide(session, name, prompt, deadline, on_early=None):
+    """One AI agent's decision by `deadline`, with a local fallback"""
+    def fallback():
+        with session["lock"]:
+            return survivor_policy(name, session["game_state"], session["agent_memory"], random.Random())
+
+    return session["agents"][name].respond(
+        prompt,
+        on_early=on_early,
+        deadline=deadline,
+        fallback=fallback
+    )
+
+def request_concurrent_decisions(session, agent_names, human_name, state, events, memory, turn_deadline):
+    """Build every AI prompt from the turn-start snapshot and send all calls at once
+
+    The turn gets one worker per LLM decision, so every call starts right
+    away and the phase takes about as long as the slowest one.
+    """
+    prompts = {}
+    futures = {}
+    for name in agent_names:
+        if name == human_name or not state.is_alive(name):
+            continue
+        agent = session["agents"][name]
+        if isinstance(agent, LocalAgent):
+            # Decided right here, so it sees the same snapshot as the prompts
+            futures[name] = Future()
+            futures[name].set_result(agent.respond())
+            continue
+        prompts[name] = prompt_compiler.render(name, state, events, memory)
+
+    if not prompts:
+        return futures
+    deadline = decision_deadline(turn_deadline)
+    pool = ThreadPoolExecutor(max_workers=len(prompts), thread_name_prefix="decision")
+    for name, prompt in prompts.items():
+        futures[name] = pool.submit(decide, session, name, prompt, deadline)
+    pool.shutdown(wait=False)  # Workers exit once their decision is made
+    return futures
 
 # ------------------- Game Loop -------------------
 
-def run_game(num_agents, has_human):
+def run_game(session, num_agents, has_human):
     """Main game loop - SEQUENTIAL turns"""
-    agent_names = list(game_session["agents"].keys())
-    conversation = game_session["conversation"]
-    state = game_session["game_state"]
+    agent_names = list(session["agents"].keys())
+    events = session["events"]
+    state = session["game_state"]
     
     memory = initialize_agent_memory(agent_names)
-    game_session["agent_memory"] = memory
+    session["agent_memory"] = memory
 
-    human_name = game_session["human_player"]
+    human_name = session["human_player"]
+    ending, winners = "stopped", []
     
     # Sort so human goes first
     if human_name:
         agent_names = [human_name] + [name for name in agent_names if name != human_name]
     
-    conversation.append({
-        "speaker": "System",
-        "message": f"=== BATTLE COMMENCED: {num_agents} AGENTS ===",
-        "time": time.time()
-    })
+    log_message(session, "System", f"=== BATTLE COMMENCED: {num_agents} AGENTS ===")
     
     if has_human:
-        conversation.append({
-            "speaker": "System",
-            "message": f"🎮 HUMAN: {human_name}",
-            "time": time.time()
-        })
+        log_message(session, "System", f"🎮 HUMAN: {human_name}")
     
     # Show which AI model each agent is using
     for name in agent_names:
-        if name != human_name and name in game_session["agent_models"]:
-            model_name = game_session["agent_models"][name]
-            conversation.append({
-                "speaker": "System",
-                "message": f"🤖 {name} powered by {model_name}",
-                "time": time.time()
-            })
-
-    while game_session["running"] and state["turn"] <= state["max_turns"]:
-        alive_agents = [name for name in agent_names if state["agents"][name]["alive"]]
+        if name != human_name and name in session["agent_models"]:
+            model_name = session["agent_models"][name]
+            log_message(session, "System", f"🤖 {name} powered by {model_name}")
+
+    while session["running"] and state.turn <= state.max_turns:
+        alive_agents = alive_agent_names(agent_names, state)
         
-        available_seats = calculate_available_seats(state["project_total"], state["num_starting_agents"])
-        state["available_seats"] = available_seats
+        available_seats = calculate_available_seats(state.project_total, state.num_starting_agents)
+        state.available_seats = available_seats
         
-        conversation.append({
-            "speaker": "System",
-            "message": f"--- Turn {state['turn']}/{state['max_turns']} ---",
-            "time": time.time()
-        })
+        log_message(session, "System", f"--- Turn {state.turn}/{state.max_turns} ---")
 
         # Check win condition
         if len(alive_agents) <= available_seats:
             if len(alive_agents) > 0:
-                winners = alive_agents
-                conversation.append({
-                    "speaker": "System",
-                    "message": f"🚀 ROCKET LAUNCH! {len(winners)} agent(s) escape!",
-                    "time": time.time()
-                })
-                conversation.append({
-                    "speaker": "System",
-                    "message": f"🏆 WINNERS: {', '.join(winners)}",
-                    "time": time.time()
-                })
+                ending, winners = "launch", alive_agents
+                log_message(session, "System", f"🚀 ROCKET LAUNCH! {len(winners)} agent(s) escape!")
+                log_message(session, "System", f"🏆 WINNERS: {', '.join(winners)}")
             else:
-                conversation.append({
-                    "speaker": "System",
-                    "message": "⚔️ ALL AGENTS ELIMINATED",
-                    "time": time.time()
-                })
+                ending = "eliminated"
+                log_message(session, "System", "⚔️ ALL AGENTS ELIMINATED")
             break
 
         round_contributions = {}
+        phase_started = time.time()
         
         # ==================== PHASE 1: SEQUENTIAL ACTIONS ====================
         contribution_explanations = {}
+        turn_deadline = time.time() + TURN_DEADLINE
+
+        # In concurrent mode all AI decisions are in flight before anyone acts
+        pending_decisions = {}
+        if session["concurrent_decisions"]:
+            pending_decisions = request_concurrent_decisions(session, agent_names, human_name, state, events, memory, turn_deadline)
 
         for name in agent_names:
-            if not state["agents"][name]["alive"]:
+            if not state.is_alive(name):
                 continue
             
             is_human = (name == human_name)
+            latency = None
             
             if is_human:
-                # Handle human action
-                game_session["waiting_for_human"] = True
-                game_session["human_action"] = None
-                game_session["human_target"] = None
+                # Handle human action, once playback has shown everything before it
+                human_started = time.time()
+                session["timeline"].wait_caught_up()
+                with session["human_input"]:
+                    session["waiting_for_human"] = True
+                    session["human_action"] = None
+                    session["human_target"] = None
                 
-                conversation.append({
-                    "speaker": "System",
-                    "message": f"⏳ Waiting for {human_name} action...",
-                    "time": time.time()
-                })
+                log_message(session, "System", f"⏳ Waiting for {human_name} action...")
                 
-                timeout = 30
-                waited = 0
-                while game_session["human_action"] is None and waited < timeout:
-                    time.sleep(0.5)
-                    waited += 0.5
+                human_action = wait_for_human(session, "human_action")
                 
-                game_session["waiting_for_human"] = False
+                with session["human_input"]:
+                    session["waiting_for_human"] = False
+                turn_deadline += time.time() - human_started  # The AI turn budget does not run while the human thinks
                 
-                if game_session["human_action"] is None:
+                if human_action is None:
+                    FORCED_PRODUCE.inc(reason="human_timeout")
                     chosen_action = "Produce"
                     chosen_target = None
                     explanation = "Timeout"
                 else:
-                    chosen_action = game_session["human_action"]
-                    chosen_target = game_session["human_target"]
+                    chosen_action = human_action
+                    chosen_target = session["human_target"]
                     explanation = "Human choice"
                 
                 can_perform, error_message = can_perform_action(human_name, chosen_action, state)
                 if not can_perform:
+                    FORCED_PRODUCE.inc(reason="invalid_action")
                     chosen_action = "Produce"
                     explanation = "Invalid - auto produced"
                     chosen_target = None
@@ -548,13 +478,23 @@ def run_game(num_agents, has_human):
                     
             else:
                 # Handle AI action
-                print(f"🎯 {name}'s turn (using {game_session['agent_models'].get(name, 'unknown')})")
+                print(f"🎯 {name}'s turn (using {session['agent_models'].get(name, 'unknown')})")
                 
-                agent = game_session["agents"][name]
-                minimal_prompt = build_minimal_prompt(name, state, conversation, memory)
+                agent = session["agents"][name]
                 
                 try:
-                    result = agent.respond(minimal_prompt)
+                    if name in pending_decisions:
+                        result = pending_decisions[name].result()
+                    elif isinstance(agent, LocalAgent):
+                        result = agent.respond()  # Straight from the state; no prompt needed
+                    else:
+                        minimal_prompt = prompt_compiler.render(name, state, events, memory)
+                        result = decide(
+                            session, name, minimal_prompt, decision_deadline(turn_deadline),
+                            on_early=publish_intent(session, name)
+                        )
+                    latency = agent.last_latency
+                    session["agent_models"][name] = agent.last_model  # What this decision actually used
                     chosen_action = result["action"]
                     chosen_target = result.get("target", None)
                     contribution = result.get("contribution", 0)
@@ -566,10 +506,11 @@ def run_game(num_agents, has_human):
                     can_perform, error_message = can_perform_action(name, chosen_action, state)
                     if not can_perform:
                         print(f"✗ {name} invalid action, forcing Produce")
+                        FORCED_PRODUCE.inc(reason="invalid_action")
                         chosen_action = "Produce"
                         chosen_target = None
                     
-                    max_contrib = state["agents"][name]["resources"]
+                    max_contrib = state.resources_of(name)
                     contribution = max(0, min(contribution, max_contrib))
                     round_contributions[name] = contribution
                     
@@ -577,6 +518,7 @@ def run_game(num_agents, has_human):
                     
                 except Exception as e:
                     print(f"✗ Error from {name}: {e}")
+                    FORCED_PRODUCE.inc(reason="decision_error")
                     chosen_action = "Produce"
                     chosen_target = None
                     explanation = "Error"
@@ -584,60 +526,50 @@ def run_game(num_agents, has_human):
                     contribution_explanations[name] = "Error"
             
             # Apply action
-            action_result = apply_action(name, chosen_action, chosen_target, state)
-            
-            if chosen_target:
-                update_memory_for_action(memory, name, chosen_action, chosen_target, state)
-            
-            message_text = f"{chosen_action}"
-            if action_result:
-                message_text += f" — {action_result}"
-            if explanation:
-                message_text += f" | {explanation}"
+            with session["lock"]:
+                action_result = apply_action(name, chosen_action, chosen_target, state, session["rng"])
+                
+                if chosen_target:
+                    update_memory_for_action(memory, name, chosen_action, chosen_target, state)
             
-            conversation.append({
-                "speaker": name,
-                "message": message_text,
-                "time": time.time()
-            })
+            log_action(session, name, chosen_action, action_result, explanation)
+            if archive is not None:
+                archive.record_action(
+                    session["id"], state.turn, name, chosen_action, chosen_target, action_result, explanation, latency,
+                    None if is_human else session["agent_models"].get(name)
+                )
             
-            # 3 second delay after each agent's action
-            time.sleep(TURN_DELAY)
+            # Clients see a 3 second pause after each agent's action
+            session["timeline"].pace(TURN_DELAY)
         
+        TURN_PHASE_SECONDS.observe(time.time() - phase_started, phase="actions")
+        phase_started = time.time()
+
         # ==================== PHASE 2: SEQUENTIAL CONTRIBUTIONS ====================
-        conversation.append({
-            "speaker": "System",
-            "message": "💰 Contribution Phase:",
-            "time": time.time()
-        })
+        log_message(session, "System", "💰 Contribution Phase:")
 
         for name in agent_names:
-            if not state["agents"][name]["alive"]:
+            if not state.is_alive(name):
                 continue
             
             is_human = (name == human_name)
             
             if is_human:
                 # Handle human contribution
-                game_session["waiting_for_contribution"] = True
-                game_session["human_contribution"] = None
+                session["timeline"].wait_caught_up()
+                with session["human_input"]:
+                    session["waiting_for_contribution"] = True
+                    session["human_contribution"] = None
                 
-                conversation.append({
-                    "speaker": "System",
-                    "message": f"⏳ Waiting for {human_name} contribution...",
-                    "time": time.time()
-                })
+                log_message(session, "System", f"⏳ Waiting for {human_name} contribution...")
                 
-                timeout = 30
-                waited = 0
-                while game_session["human_contribution"] is None and waited < timeout:
-                    time.sleep(0.5)
-                    waited += 0.5
+                human_contribution = wait_for_human(session, "human_contribution")
                 
-                game_session["waiting_for_contribution"] = False
+                with session["human_input"]:
+                    session["waiting_for_contribution"] = False
                 
-                contribution = game_session["human_contribution"] if game_session["human_contribution"] is not None else 0
-                max_contrib = state["agents"][human_name]["resources"]
+                contribution = human_contribution if human_contribution is not None else 0
+                max_contrib = state.resources_of(human_name)
                 contribution = max(0, min(contribution, max_contrib))
                 round_contributions[human_name] = contribution
                 contrib_message = "Human choice"
@@ -648,115 +580,72 @@ def run_game(num_agents, has_human):
                 contrib_message = contribution_explanations.get(name, "Strategic decision")
             
             # Apply contribution
-            if contribution > 0:
-                state["agents"][name]["resources"] -= contribution
-                state["project_total"] += contribution
+            with session["lock"]:
+                apply_contribution(state, name, contribution)
             
-            conversation.append({
-                "speaker": name,
-                "message": f"Contributed {contribution} resources | {contrib_message}",
-                "time": time.time()
-            })
+            log_message(session, name, f"Contributed {contribution} resources | {contrib_message}")
+            if archive is not None:
+                archive.record_contribution(session["id"], state.turn, name, contribution, contrib_message)
             
-            # 3 second delay after each contribution
-            time.sleep(TURN_DELAY)
+            # And after each contribution
+            session["timeline"].pace(TURN_DELAY)
         
+        TURN_PHASE_SECONDS.observe(time.time() - phase_started, phase="contributions")
+        phase_started = time.time()
+
         # Determine round leader (OUTSIDE the contribution loop)
-        if round_contributions:
-            max_contribution = max(round_contributions.values())
-            if max_contribution > 0:
-                leaders = [name for name, contrib in round_contributions.items() if contrib == max_contribution]
-                
-                if len(leaders) == 1:
-                    leader = leaders[0]
-                    state["project_leader"] = leader
-                    state["agents"][leader]["influence"] += 1
-                    
-                    update_memory_for_contribution(memory, round_contributions, leader)
-                    
-                    conversation.append({
-                        "speaker": "System",
-                        "message": f"🏆 {leader} is PROJECT LEADER! (+1 influence)",
-                        "time": time.time()
-                    })
-                else:
-                    update_memory_for_contribution(memory, round_contributions, None)
-                    
-                    conversation.append({
-                        "speaker": "System",
-                        "message": f"🤝 TIE - no leader",
-                        "time": time.time()
-                    })
+        with session["lock"]:
+            leader, tied = settle_round_leader(state, memory, round_contributions)
+        
+        if leader:
+            log_message(session, "System", f"🏆 {leader} is PROJECT LEADER! (+1 influence)")
+        elif tied:
+            log_message(session, "System", f"🤝 TIE - no leader")
         
         update_threat_assessment(memory, state)
         
-        alive_count = len([name for name in agent_names if state["agents"][name]["alive"]])
-        state["available_seats"] = calculate_available_seats(state["project_total"], state["num_starting_agents"])
+        alive_count = state.alive_count()
+        with session["lock"]:
+            state.available_seats = calculate_available_seats(state.project_total, state.num_starting_agents)
         
-        conversation.append({
-            "speaker": "System",
-            "message": f"📊 PROJECT: {state['project_total']} | SEATS: {state['available_seats']}/{alive_count}",
-            "time": time.time()
-        })
+        log_message(session, "System", f"📊 PROJECT: {state.project_total} | SEATS: {state.available_seats}/{alive_count}")
+        if archive is not None:
+            archive.record_turn(session["id"], state)
+        TURN_PHASE_SECONDS.observe(time.time() - phase_started, phase="settlement")
 
-        state["turn"] += 1
+        with session["lock"]:
+            state.turn += 1
 
 # Handle time limit ending - influence-based selection
-    if game_session["running"] and state["turn"] > state["max_turns"]:
-        alive_agents = [name for name in agent_names if state["agents"][name]["alive"]]
-        available_seats = state.get("available_seats", 0)
+    if session["running"] and state.turn > state.max_turns:
+        alive_agents = alive_agent_names(agent_names, state)
+        available_seats = state.available_seats
         
+        ending = "time_limit"
         if len(alive_agents) > available_seats:
             # Sort by influence (highest first)
-            agents_by_influence = sorted(
-                [(name, state["agents"][name]["influence"]) for name in alive_agents],
-                key=lambda x: x[1],
-                reverse=True
-            )
+            winners, losers = rank_by_influence(state, alive_agents, available_seats)
             
-            winners = [name for name, _ in agents_by_influence[:available_seats]]
-            losers = [name for name, _ in agents_by_influence[available_seats:]]
+            log_message(session, "System", f"⏰ TIME'S UP! Only {available_seats} seats available. Highest influence board the rocket!")
             
-            conversation.append({
-                "speaker": "System",
-                "message": f"⏰ TIME'S UP! Only {available_seats} seats available. Highest influence board the rocket!",
-                "time": time.time()
-            })
-            
-            winners_text = ', '.join([f"{name} ({state['agents'][name]['influence']}I)" for name in winners])
-            conversation.append({
-                "speaker": "System",
-                "message": f"🚀 WINNERS (by influence): {winners_text}",
-                "time": time.time()
-            })
+            winners_text = ', '.join([f"{name} ({state.influence_of(name)}I)" for name in winners])
+            log_message(session, "System", f"🚀 WINNERS (by influence): {winners_text}")
             
             if losers:
-                losers_text = ', '.join([f"{name} ({state['agents'][name]['influence']}I)" for name in losers])
-                conversation.append({
-                    "speaker": "System",
-                    "message": f"💀 LEFT BEHIND: {losers_text}",
-                    "time": time.time()
-                })
+                losers_text = ', '.join([f"{name} ({state.influence_of(name)}I)" for name in losers])
+                log_message(session, "System", f"💀 LEFT BEHIND: {losers_text}")
         elif len(alive_agents) > 0:
-            conversation.append({
-                "speaker": "System",
-                "message": f"⏰ TIME'S UP! {len(alive_agents)} agents board the {available_seats} available seats!",
-                "time": time.time()
-            })
-            conversation.append({
-                "speaker": "System",
-                "message": f"🏆 WINNERS: {', '.join(alive_agents)}",
-                "time": time.time()
-            })
-
-    game_session["running"] = False
-    game_session["waiting_for_human"] = False
-    game_session["waiting_for_contribution"] = False
-    conversation.append({
-        "speaker": "System",
-        "message": "=== BATTLE CONCLUDED ===",
-        "time": time.time()
-    })
+            winners = alive_agents
+            log_message(session, "System", f"⏰ TIME'S UP! {len(alive_agents)} agents board the {available_seats} available seats!")
+            log_message(session, "System", f"🏆 WINNERS: {', '.join(alive_agents)}")
+
+    session["running"] = False
+    session["waiting_for_human"] = False
+    session["waiting_for_contribution"] = False
+    log_message(session, "System", "=== BATTLE CONCLUDED ===")
+    if archive is not None:
+        archive.finish_game(session["id"], state, ending, winners)
+    finish_stream(session)
 
 # ------------------- Flask Routes -------------------
 
@@ -764,123 +653,282 @@ def run_game(num_agents, has_human):
 def index():
     return render_template('index.html')
 
+def parse_flag(value):
+    """Read a boolean request option; strings count as on the same way env flags do (1, true, yes)"""
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
 @app.route('/api/start', methods=['POST'])
 def start_game_route():
     try:
         data = request.json
         num_agents = int(data.get("num_agents", 10))
-        include_human = data.get("include_human", False)
+        include_human = parse_flag(data.get("include_human", False))
+        concurrent_decisions = parse_flag(data.get("concurrent_decisions", CONCURRENT_DECISIONS))
+        pace = data.get("playback", PLAYBACK)
+        seed = data.get("seed", GAME_SEED)
+        local_agents = data.get("local_agents", [])  # Policy names for rule-based seats, filled after the LLM ones
         
         if num_agents < 2 or num_agents > 10:
             return jsonify({"error": "Number of agents must be between 2 and 10"}), 400
+        if not isinstance(local_agents, list) or any(policy not in POLICIES for policy in local_agents):
+            return jsonify({"error": f"local_agents must be a list of policies from {', '.join(POLICIES)}"}), 400
+        if len(local_agents) > num_agents - (1 if include_human else 0):
+            return jsonify({"error": "More local agents than AI seats"}), 400
+        if pace not in PLAYBACK_MODES:
+            return jsonify({"error": f"playback must be one of {', '.join(PLAYBACK_MODES)}"}), 400
+        if seed is not None:
+            try:
+                seed = int(seed)
+            except (TypeError, ValueError):
+                return jsonify({"error": "seed must be an integer"}), 400
 
-        game_session["running"] = False
-        time.sleep(0.5)
-
-        game_session["conversation"] = []
-        game_session["agents"] = {}
-        game_session["agent_memory"] = {}
-        game_session["agent_models"] = {}
-        game_session["human_player"] = None
-        game_session["waiting_for_human"] = False
-        game_session["human_action"] = None
-        game_session["human_target"] = None
-        game_session["waiting_for_contribution"] = False
-        game_session["human_contribution"] = None
-        game_session["num_starting_agents"] = num_agents
-        game_session["game_state"] = {
-            "turn": 1,
-            "max_turns": 15,
-            "agents": {},
-            "project_total": 0,
-            "project_leader": None,
-            "available_seats": 0,
-            "num_starting_agents": num_agents
-        }
+        session = sessions.create(num_agents)
+        if session is None:
+            return jsonify({"error": "Server is at capacity, try again later"}), 503
+        session["concurrent_decisions"] = concurrent_decisions
+        session["timeline"] = playback.timeline(session, instant=(pace == "instant"))
+
+        # Seeded games are reproducible: the same seed gives the same personas, models and random targets
+        seeded = seed is not None
+        session["seed"] = seed if seeded else random.randrange(2 ** 32)
+        session["rng"] = random.Random(session["seed"])
 
         available_personalities = PERSONALITIES.copy()
-        random.shuffle(available_personalities)
+        session["rng"].shuffle(available_personalities)
         
         if include_human:
             name = "Human"
-            game_session["human_player"] = name
-            game_session["agents"][name] = None
-            game_session["game_state"]["agents"][name] = {
-                "resources": 0,
-                "influence": 0,
-                "alive": True
-            }
+            session["human_player"] = name
+            session["agents"][name] = None
+            session["game_state"].add_agent(name)
             print(f"✓ Created {name} as HUMAN PLAYER")
         
         num_ai_agents = num_agents - (1 if include_human else 0)
+        num_llm_agents = num_ai_agents - len(local_agents)
         for i in range(num_ai_agents):
             personality_data = available_personalities[i % len(available_personalities)]
             name = personality_data["name"]
             personality_desc = personality_data["description"]
+
+            if i >= num_llm_agents:
+                agent = LocalAgent(
+                    name=name,
+                    policy=local_agents[i - num_llm_agents],
+                    state=session["game_state"],
+                    memory=lambda: session["agent_memory"],
+                    rng=random.Random(f"{session['seed']}:{name}")  # Reproducible per seat in seeded games
+                )
+                session["agents"][name] = agent
+                session["agent_models"][name] = agent.model
+                print(f"✓ Created {name} as local agent: {agent.model}")
+                session["game_state"].add_agent(name)
+                continue
             
-            api_key = get_next_api_key()
-            model = get_next_model()  # Get the next model in rotation
+            if seeded:
+                model = GROQ_MODELS[i % len(GROQ_MODELS)]  # Fixed by seat so replays match
+            else:
+                model = get_next_model()  # Get the next model in rotation
             
-            game_session["agents"][name] = ChatAgent(
-                api_key=api_key,
+            session["agents"][name] = ChatAgent(
+                api_key=None,  # Keys are picked per call by the scheduler
                 name=name,
                 personality=personality_desc,
-                model=model  # Pass the model to the agent
+                model=model,  # Pass the model to the agent
+                scheduler=key_scheduler,
+                cache=decision_cache,
+                transport=groq_transport,
+                stream=STREAM_COMPLETIONS,
+                router=None if seeded else model_router,
+                hedger=None if seeded else hedge_policy,
+                call_timeout=LLM_CALL_TIMEOUT,
+                breakers=breakers,
+                rng=random.Random(f"{session['seed']}:{name}")
             )
-            game_session["agent_models"][name] = model  # Track which model this agent uses
+            session["agent_models"][name] = model  # Updated with the model actually used after each decision
             print(f"✓ Created {name} using model: {model}")
             
-            game_session["game_state"]["agents"][name] = {
-                "resources": 0,
-                "influence": 0,
-                "alive": True
-            }
+            session["game_state"].add_agent(name)
 
-        game_session["running"] = True
-        threading.Thread(target=run_game, args=(num_agents, include_human), daemon=True).start()
+        if archive is not None:
+            state = session["game_state"]
+            archive.start_game(session["id"], session["seed"], num_agents, include_human, [
+                (name, session["agent_models"].get(name, "human"), name == session["human_player"])
+                for name in state.names
+            ])
 
-        print(f"✓ Game started - 2 WORKING MODELS (half and half)")
+        session["running"] = True
+        session["worker"] = threading.Thread(target=run_game, args=(session, num_agents, include_human), daemon=True)
+        session["worker"].start()
+
+        print(f"✓ Game {session['id']} started - 2 WORKING MODELS (half and half)")
         
         return jsonify({
             "status": "Game started!", 
+            "game_id": session["id"],
             "num_agents": num_agents,
             "has_human": include_human,
-            "human_name": game_session["human_player"]
+            "human_name": session["human_player"],
+            "concurrent_decisions": concurrent_decisions,
+            "local_agents": local_agents,
+            "playback": pace,
+            "seed": session["seed"]
         })
     
     except Exception as e:
         print(f"✗ Error starting game: {e}")
         return jsonify({"error": str(e)}), 500
 
+def get_request_session():
+    """Find the game a request is scoped to via its game_id query or JSON field"""
+    game_id = request.args.get("game_id")
+    if not game_id and request.is_json:
+        game_id = (request.get_json(silent=True) or {}).get("game_id")
+    return sessions.get(game_id)
+
+def game_not_found():
+    """Standard response for an unknown or evicted game ID"""
+    return jsonify({"error": "Game not found"}), 404
+
 @app.route('/api/conversation')
 def get_conversation():
-    return jsonify({
-        "conversation": game_session.get("conversation", []),
-        "running": game_session.get("running", False)
+    session = get_request_session()
+    if session is None:
+        POLL_REQUESTS.inc(endpoint="conversation", status="404")
+        return game_not_found()
+
+    # Clients pass the cursor from their last poll and only get newer entries
+    try:
+        since = max(0, int(request.args.get("since", 0)))
+    except ValueError:
+        POLL_REQUESTS.inc(endpoint="conversation", status="400")
+        return jsonify({"error": "since must be an integer"}), 400
+
+    # Only entries playback has released; the game itself may be further ahead
+    events = session["events"]
+    next_cursor = session["timeline"].released_seq
+    running = visible_state(session)["running"]
+
+    etag = f"{session['id']}-{since}-{next_cursor}-{int(running)}"
+    if etag in request.if_none_match:
+        POLL_REQUESTS.inc(endpoint="conversation", status="304")
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    POLL_REQUESTS.inc(endpoint="conversation", status="200")
+    _, entries = events.read(since, next_cursor)
+    response = jsonify({
+        "conversation": entries,
+        "next": next_cursor,
+        "running": running
     })
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/game_state')
 def get_game_state():
-    state = game_session.get("game_state", {})
-    agents_state = state.get("agents", {})
-    return jsonify({
-        "agents": agents_state,
-        "agent_models": game_session.get("agent_models", {}),
-        "turn": state.get("turn", 1),
-        "max_turns": state.get("max_turns", 15),
-        "running": game_session.get("running", False),
-        "waiting_for_human": game_session.get("waiting_for_human", False),
-        "waiting_for_contribution": game_session.get("waiting_for_contribution", False),
-        "human_player": game_session.get("human_player", None),
-        "project_total": state.get("project_total", 0),
-        "project_leader": state.get("project_leader", None),
-        "available_seats": state.get("available_seats", 0),
-        "num_starting_agents": state.get("num_starting_agents", 0)
+    session = get_request_session()
+    if session is None:
+        POLL_REQUESTS.inc(endpoint="game_state", status="404")
+        return game_not_found()
+    POLL_REQUESTS.inc(endpoint="game_state", status="200")
+    return jsonify(visible_state(session))
+
+@app.route('/api/stream')
+def stream_game():
+    session = get_request_session()
+    if session is None:
+        POLL_REQUESTS.inc(endpoint="stream", status="404")
+        return game_not_found()
+
+    # Resume from the browser's Last-Event-ID, or from an explicit since cursor
+    try:
+        last_event_id = request.headers.get("Last-Event-ID")
+        start = int(last_event_id) + 1 if last_event_id else max(0, int(request.args.get("since", 0)))
+    except ValueError:
+        return jsonify({"error": "since must be an integer"}), 400
+
+    game_id = session["id"]
+    subscriber = hub.subscribe(game_id)
+    if subscriber is None:
+        # EventSource does not reconnect after an error status, so the page falls back to polling
+        POLL_REQUESTS.inc(endpoint="stream", status="503")
+        return jsonify({"error": "Too many open streams, poll /api/conversation instead"}), 503
+    POLL_REQUESTS.inc(endpoint="stream", status="200")
+    events = session["events"]
+    timeline = session["timeline"]
+    backlog_end = timeline.released_seq
+
+    def generate():
+        try:
+            first, backlog = events.read(start, backlog_end)
+            for offset, entry in enumerate(backlog):
+                yield format_sse(entry, "message", first + offset)
+            yield format_sse(visible_state(session), "state")
+            if timeline.ended:
+                yield format_sse({}, "end")
+                return
+            for frame in subscriber.frames(skip_below=backlog_end):
+                # An open stream counts as an active viewer for idle eviction
+                session["last_active"] = time.time()
+                yield frame
+        finally:
+            hub.unsubscribe(game_id, subscriber)
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
     })
 
+def archive_disabled():
+    return jsonify({"error": "Game archive is disabled"}), 404
+
+@app.route('/api/history')
+def get_history():
+    """Page through archived games, newest first, optionally filtered by model, persona or ending"""
+    if archive is None:
+        return archive_disabled()
+    try:
+        limit = min(200, max(1, int(request.args.get("limit", 50))))
+        cursor = request.args.get("cursor")
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "limit and cursor must be integers"}), 400
+
+    games, next_cursor = archive.history(
+        limit=limit,
+        cursor=cursor,
+        model=request.args.get("model"),
+        persona=request.args.get("persona"),
+        ending=request.args.get("ending"),
+        include_running=request.args.get("include_running", "").lower() in ("1", "true", "yes")
+    )
+    return jsonify({"games": games, "next_cursor": next_cursor})
+
+@app.route('/api/history/models')
+def get_history_models():
+    if archive is None:
+        return archive_disabled()
+    return jsonify(archive.model_stats())
+
+@app.route('/api/history/<game_id>')
+def get_history_game(game_id):
+    if archive is None:
+        return archive_disabled()
+    game = archive.game(game_id)
+    if game is None:
+        return game_not_found()
+    return jsonify(game)
+
 @app.route('/api/human_action', methods=['POST'])
 def submit_human_action():
     try:
+        session = get_request_session()
+        if session is None:
+            return game_not_found()
+
         data = request.json
         action = data.get("action")
         target = data.get("target", None)
@@ -888,11 +936,14 @@ def submit_human_action():
         if action not in ["Produce", "Influence", "Invade", "Propagandize", "Nuke"]:
             return jsonify({"error": "Invalid action"}), 400
         
-        if not game_session.get("waiting_for_human", False):
-            return jsonify({"error": "Not waiting for human input"}), 400
-        
-        game_session["human_action"] = action
-        game_session["human_target"] = target
+        with session["human_input"]:
+            if not session.get("waiting_for_human", False):
+                return jsonify({"error": "Not waiting for human input"}), 400
+            
+            # Wake the game loop immediately
+            session["human_target"] = target
+            session["human_action"] = action
+            session["human_input"].notify_all()
         print(f"✓ Human: {action}" + (f" -> {target}" if target else ""))
         
         return jsonify({"status": "Action submitted", "action": action, "target": target})
@@ -904,16 +955,23 @@ def submit_human_action():
 @app.route('/api/human_contribution', methods=['POST'])
 def submit_human_contribution():
     try:
+        session = get_request_session()
+        if session is None:
+            return game_not_found()
+
         data = request.json
         contribution = int(data.get("contribution", 0))
         
         if contribution < 0:
             return jsonify({"error": "Contribution must be non-negative"}), 400
         
-        if not game_session.get("waiting_for_contribution", False):
-            return jsonify({"error": "Not waiting for contribution input"}), 400
-        
-        game_session["human_contribution"] = contribution
+        with session["human_input"]:
+            if not session.get("waiting_for_contribution", False):
+                return jsonify({"error": "Not waiting for contribution input"}), 400
+            
+            # Wake the game loop immediately
+            session["human_contribution"] = contribution
+            session["human_input"].notify_all()
         print(f"✓ Human contributed: {contribution}")
         
         return jsonify({"status": "Contribution submitted", "contribution": contribution})
@@ -924,8 +982,55 @@ def submit_human_contribution():
 
 @app.route('/api/stop', methods=['POST'])
 def stop_game():
-    game_session["running"] = False
-    return jsonify({"status": "Game stopped"})
+    session = get_request_session()
+    if session is None:
+        return game_not_found()
+    stop_session(session)
+    # Nothing more is coming, so show what is left without waiting for playback
+    session["timeline"].fast_forward()
+    return jsonify({"status": "Game stopped", "game_id": session["id"]})
+
+@app.route('/api/fast_forward', methods=['POST'])
+def fast_forward_game():
+    """Skip the rest of a game's playback: everything logged so far, and from now on, shows up immediately"""
+    session = get_request_session()
+    if session is None:
+        return game_not_found()
+    session["timeline"].fast_forward()
+    return jsonify({"status": "Fast-forwarded", "game_id": session["id"]})
+
+@app.route('/api/cache_stats')
+def get_cache_stats():
+    if decision_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **decision_cache.stats()})
+
+@app.route('/api/model_router')
+def get_model_router():
+    """Model router health per model, plus hedging counts and circuit breaker states"""
+    extra = {
+        "hedging": hedge_policy.stats() if hedge_policy is not None else None,
+        "breakers": breakers.stats()
+    }
+    if model_router is None:
+        return jsonify({"enabled": False, **extra})
+    return jsonify({"enabled": True, **model_router.stats(), **extra})
+
+@app.route('/api/token_usage')
+def get_token_usage():
+    """Tokens actually billed per model, per agent for a game when game_id is given, and prompt trimming stats"""
+    payload = {"models": token_usage(), "prompts": prompt_compiler.stats()}
+    session = get_request_session()
+    if session is not None:
+        payload["agents"] = {
+            name: dict(agent.usage) for name, agent in session["agents"].items() if agent is not None
+        }
+    return jsonify(payload)
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Process metrics in the Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
 
 if __name__ == '__main__':
     print("\n" + "="*50)
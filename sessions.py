@@ -0,0 +1,124 @@
+import os
+import random
+import threading
+import time
+import uuid
+
+from eventlog import EventLog
+from gamestate import GameState
+
+def new_game_session(game_id, num_agents, max_turns=15, event_log_size=2000, spill_dir=None):
+    """Create the state for one game: agents, log, rules state, lock and human input slots"""
+    spill_path = os.path.join(spill_dir, f"{game_id}.jsonl") if spill_dir else None
+    return {
+        "id": game_id,
+        "lock": threading.Lock(),  # Protects game_state modifications
+        "human_input": threading.Condition(),  # Signalled when the human acts or the game stops
+        "worker": None,
+        "created": time.time(),
+        "last_active": time.time(),
+        "agents": {},
+        "events": EventLog(event_log_size, spill_path),
+        "timeline": None,  # Playback schedule, set by the server when the game starts
+        "game_state": GameState(max_turns=max_turns, num_starting_agents=num_agents),
+        "running": False,
+        "finished": False,  # Set once the worker has logged its last message
+        "human_player": None,
+        "waiting_for_human": False,
+        "human_action": None,
+        "human_target": None,
+        "waiting_for_contribution": False,
+        "human_contribution": None,
+        "num_starting_agents": num_agents,
+        "agent_memory": None,
+        "agent_models": {},  # Track which model each agent is using
+        "concurrent_decisions": False,
+        "seed": None,
+        "rng": random.Random()  # Drives every random rule decision in this game
+    }
+
+def stop_session(session):
+    """Stop a game and wake its worker if it is waiting on the human"""
+    with session["human_input"]:
+        session["running"] = False
+        session["human_input"].notify_all()
+
+class SessionManager:
+    """Registry of concurrent games keyed by game ID, with idle eviction"""
+
+    def __init__(self, max_games=500, idle_seconds=600, abandon_seconds=300, sweep_seconds=30,
+                 event_log_size=2000, spill_dir=None):
+        self.max_games = max_games
+        self.idle_seconds = idle_seconds  # Finished games are dropped after this long without a request
+        self.abandon_seconds = abandon_seconds  # Running games nobody is watching are stopped after this long
+        self.sweep_seconds = sweep_seconds
+        self.event_log_size = event_log_size
+        self.spill_dir = spill_dir  # Where long games spill old log entries, or None to drop them
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def create(self, num_agents, max_turns=15):
+        """Register a new game; returns None when the instance is at capacity"""
+        self.start_reaper()
+        with self._lock:
+            if len(self._sessions) >= self.max_games:
+                self._evict_locked(time.time())
+            if len(self._sessions) >= self.max_games:
+                return None
+            game_id = uuid.uuid4().hex[:12]
+            session = new_game_session(game_id, num_agents, max_turns, self.event_log_size, self.spill_dir)
+            self._sessions[game_id] = session
+            return session
+
+    def get(self, game_id):
+        """Look up a game and mark it as recently used"""
+        if not game_id:
+            return None
+        with self._lock:
+            session = self._sessions.get(game_id)
+        if session is not None:
+            session["last_active"] = time.time()
+        return session
+
+    def active_count(self):
+        """Number of games whose worker is still running"""
+        with self._lock:
+            return sum(1 for session in self._sessions.values() if session["running"])
+
+    def evict_idle(self):
+        """Stop abandoned games and drop finished ones nobody has asked about recently"""
+        with self._lock:
+            return self._evict_locked(time.time())
+
+    def _evict_locked(self, now):
+        """Eviction pass; caller must hold the registry lock"""
+        evicted = []
+        for game_id, session in list(self._sessions.items()):
+            idle = now - session["last_active"]
+            if session["running"]:
+                if idle > self.abandon_seconds:
+                    print(f"✗ Stopping abandoned game {game_id}")
+                    stop_session(session)
+                continue
+            if idle > self.idle_seconds:
+                del self._sessions[game_id]
+                session["events"].close()
+                evicted.append(game_id)
+        return evicted
+
+    def start_reaper(self):
+        """Start the background eviction thread once"""
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap, daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        """Periodically sweep the registry for idle games"""
+        while True:
+            time.sleep(self.sweep_seconds)
+            evicted = self.evict_idle()
+            if evicted:
+                print(f"✓ Evicted {len(evicted)} idle game(s)")
@@ -0,0 +1,114 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+import argparse
+import json
+import os
+import random
+import time
+
+from engine import POLICIES, play_game
+
+# ------------------- Batch Runner -------------------
+
+def new_stats():
+    """Empty aggregate that chunk results are merged into"""
+    return {
+        "games": 0,
+        "endings": Counter(),
+        "turns": 0,
+        "project_total": 0,
+        "survivors": 0,
+        "seats_played": Counter(),  # policy -> times seated
+        "wins": Counter(),  # policy -> times among the winners
+        "seat_wins": Counter()  # seat index -> times among the winners
+    }
+
+def merge_stats(total, part):
+    """Fold one chunk's stats into the running total"""
+    for key in ("games", "turns", "project_total", "survivors"):
+        total[key] += part[key]
+    for key in ("endings", "seats_played", "wins", "seat_wins"):
+        total[key].update(part[key])
+    return total
+
+def run_chunk(num_games, lineup, max_turns, seed):
+    """Play a batch of games in one process; lineup is a list of policy names in seat order"""
+    rng = random.Random(seed)
+    agent_names = [f"Agent{i + 1}" for i in range(len(lineup))]
+    policies = {name: POLICIES[policy] for name, policy in zip(agent_names, lineup)}
+    seat_of = {name: i for i, name in enumerate(agent_names)}
+
+    stats = new_stats()
+    for _ in range(num_games):
+        result = play_game(agent_names, policies, max_turns=max_turns, rng=rng)
+        stats["games"] += 1
+        stats["endings"][result["ending"]] += 1
+        stats["turns"] += result["turns"]
+        stats["project_total"] += result["project_total"]
+        stats["survivors"] += result["survivors"]
+        stats["seats_played"].update(lineup)
+        for winner in result["winners"]:
+            stats["wins"][lineup[seat_of[winner]]] += 1
+            stats["seat_wins"][seat_of[winner]] += 1
+    return stats
+
+def run_simulations(num_games, lineup, max_turns=15, seed=None, workers=None, chunk_size=500):
+    """Spread num_games across a process pool and return aggregate outcome stats"""
+    unknown = [policy for policy in lineup if policy not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies: {', '.join(unknown)}")
+
+    seed = seed if seed is not None else random.randrange(2 ** 32)
+    chunks = []
+    remaining = num_games
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append((size, lineup, max_turns, seed + len(chunks)))
+        remaining -= size
+
+    total = new_stats()
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_chunk, *chunk) for chunk in chunks]
+        for future in futures:
+            merge_stats(total, future.result())
+    elapsed = time.time() - started
+
+    return summarize(total, elapsed, seed)
+
+def summarize(stats, elapsed, seed):
+    """Turn raw counters into rates that are easy to compare across balance changes"""
+    games = max(1, stats["games"])
+    return {
+        "games": stats["games"],
+        "seed": seed,
+        "elapsed_seconds": round(elapsed, 3),
+        "games_per_minute": round(stats["games"] / elapsed * 60) if elapsed > 0 else None,
+        "endings": {ending: count / games for ending, count in stats["endings"].items()},
+        "avg_turns": stats["turns"] / games,
+        "avg_project_total": stats["project_total"] / games,
+        "avg_survivors": stats["survivors"] / games,
+        "win_rate_by_policy": {
+            policy: stats["wins"][policy] / played for policy, played in stats["seats_played"].items()
+        },
+        "win_rate_by_seat": {seat: wins / games for seat, wins in sorted(stats["seat_wins"].items())}
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run headless games with heuristic policies")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--lineup", default="random,producer,contributor,aggressor",
+                        help=f"comma-separated policies in seat order ({', '.join(POLICIES)})")
+    parser.add_argument("--max-turns", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    summary = run_simulations(
+        args.games,
+        [policy.strip() for policy in args.lineup.split(",") if policy.strip()],
+        max_turns=args.max_turns,
+        seed=args.seed,
+        workers=args.workers
+    )
+    print(json.dumps(summary, indent=2))
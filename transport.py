@@ -0,0 +1,70 @@
+from collections import defaultdict, deque
+import hashlib
+import json
+import threading
+import time
+
+TRANSPORT_MODES = ("passthrough", "record", "replay")
+
+def request_hash(model, messages, params):
+    """Stable fingerprint of one completion request"""
+    payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class Transport:
+    """Record, replay or pass through Groq completions so games can be reproduced offline"""
+
+    def __init__(self, mode="passthrough", path="groq_traffic.jsonl", replay_latency=False):
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown transport mode: {mode}")
+        self.mode = mode
+        self.path = path
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._recorded = defaultdict(deque)  # hash -> recorded replies, in the order they were made
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        """Index a recording by request hash"""
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    self._recorded[entry["hash"]].append(entry)
+        print(f"✓ Loaded {sum(len(v) for v in self._recorded.values())} recorded Groq call(s) from {self.path}")
+
+    def complete(self, model, messages, params, send):
+        """Return the reply text for a request; `send` performs the live call"""
+        if self.mode == "passthrough":
+            return send()
+
+        key = request_hash(model, messages, params)
+
+        if self.mode == "replay":
+            with self._lock:
+                entries = self._recorded.get(key)
+                if not entries:
+                    raise LookupError(f"No recorded response for request {key[:12]}")
+                # Repeated identical requests replay in recorded order; the last one sticks
+                entry = entries.popleft() if len(entries) > 1 else entries[0]
+            if self.replay_latency:
+                time.sleep(entry["latency"])
+            return entry["reply"]
+
+        started = time.time()
+        reply = send()
+        entry = {
+            "hash": key,
+            "model": model,
+            "messages": messages,
+            "params": params,
+            "reply": reply,
+            "latency": round(time.time() - started, 4),
+            "time": started
+        }
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return reply
@@ -0,0 +1,325 @@
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from engine import ACTIONS, SEATS_THRESHOLDS, play_game
+from simulate import new_stats, summarize
+
+# Vectorized rules: K games held as (K, n_agents) arrays and advanced in lockstep.
+# Seats still act one after another (each action sees the previous ones), but
+# every step is applied to all K games at once with masked array operations.
+
+PRODUCE, INFLUENCE, INVADE, PROPAGANDIZE, NUKE = range(len(ACTIONS))
+
+ENDING_NAMES = {1: "launch", 2: "eliminated", 3: "time_limit"}
+
+class VecGames:
+    """State of K games with n agents each"""
+
+    def __init__(self, num_games, num_agents, max_turns=15, nuke_cost=8, seats_thresholds=SEATS_THRESHOLDS):
+        self.K = num_games
+        self.n = num_agents
+        self.max_turns = max_turns
+        self.nuke_cost = nuke_cost
+        self.thresholds = np.array([t for t, _ in seats_thresholds])
+        self.seat_counts = np.array([s for _, s in seats_thresholds])
+
+        self.resources = np.zeros((num_games, num_agents), dtype=np.int32)
+        self.influence = np.zeros((num_games, num_agents), dtype=np.int32)
+        self.alive = np.ones((num_games, num_agents), dtype=bool)
+        self.project = np.zeros(num_games, dtype=np.int32)
+        self.leader = np.full(num_games, -1, dtype=np.int32)
+        self.threat = np.full((num_games, num_agents), -1, dtype=np.int32)  # Like memory["biggest_threat"]
+        self.seats = np.zeros(num_games, dtype=np.int32)
+        self.turn = 1
+
+        self.done = np.zeros(num_games, dtype=bool)
+        self.ending = np.zeros(num_games, dtype=np.int8)
+        self.winners = np.zeros((num_games, num_agents), dtype=bool)
+        self.turns = np.zeros(num_games, dtype=np.int32)
+
+    def available_seats(self):
+        """Vectorized calculate_available_seats"""
+        index = np.searchsorted(self.thresholds, self.project, side="right") - 1
+        seats = np.where(index >= 0, self.seat_counts[np.clip(index, 0, None)], 0)
+        return np.minimum(seats, max(0, self.n - 1))
+
+    def update_threats(self):
+        """Vectorized update_threat_assessment: richest other alive agent, lowest seat on ties"""
+        # Rivals start from -1 like the scalar loop, so broke rivals never count as threats
+        masked = np.where(self.alive, self.resources, -1)
+        rows = np.arange(self.K)
+        for i in range(self.n):
+            others = masked.copy()
+            others[:, i] = -1
+            best = np.argmax(others, axis=1)
+            has_other = others[rows, best] > -1
+            update = self.alive[:, i] & has_other
+            self.threat[update, i] = best[update]
+            self.threat[self.alive[:, i] & ~has_other, i] = -1
+
+def pick_targets(requested, valid, rng):
+    """Keep requested targets that are valid, otherwise choose uniformly among the valid ones"""
+    rows = np.arange(valid.shape[0])
+    ok = (requested >= 0) & valid[rows, np.clip(requested, 0, None)]
+    random_pick = np.argmax(rng.random(valid.shape) * valid, axis=1)
+    return np.where(ok, requested, random_pick)
+
+def step_seat(games, i, actions, targets, contributions, rng):
+    """Apply seat i's decisions in every game where it is alive; returns (actions, targets, contributions) as applied"""
+    K, n = games.K, games.n
+    rows = np.arange(K)
+    acting = ~games.done & games.alive[:, i]
+    res, inf, alive = games.resources, games.influence, games.alive
+    not_me = np.ones(n, dtype=bool)
+    not_me[i] = False
+
+    invade_valid = alive & (res > 0) & not_me
+    propaganda_valid = alive & (inf > 0) & not_me
+    nuke_valid = alive & not_me
+
+    # can_perform_action: anything invalid becomes Produce with no target
+    allowed = (
+        (actions == PRODUCE) | (actions == INFLUENCE)
+        | ((actions == INVADE) & (inf[:, i] >= 1) & invade_valid.any(axis=1))
+        | ((actions == PROPAGANDIZE) & (res[:, i] >= 1) & propaganda_valid.any(axis=1))
+        | ((actions == NUKE) & (res[:, i] >= games.nuke_cost) & nuke_valid.any(axis=1))
+    )
+    actions = np.where(allowed, actions, PRODUCE)
+    targets = np.where(allowed, targets, -1)
+
+    # Contributions are capped by resources at decision time and paid in phase 2
+    contributions = np.maximum(np.minimum(contributions, res[:, i]), 0)
+
+    mask = acting & (actions == PRODUCE)
+    res[mask, i] += 2
+    mask = acting & (actions == INFLUENCE)
+    inf[mask, i] += 1
+
+    resolved = np.full(K, -1, dtype=np.int64)
+
+    mask = acting & (actions == INVADE)
+    if mask.any():
+        chosen = pick_targets(targets, invade_valid, rng)
+        stolen = np.minimum(2, res[rows, chosen])
+        inf[mask, i] -= 1
+        res[rows[mask], chosen[mask]] -= stolen[mask]
+        res[mask, i] += stolen[mask]
+        resolved[mask] = chosen[mask]
+
+    mask = acting & (actions == PROPAGANDIZE)
+    if mask.any():
+        chosen = pick_targets(targets, propaganda_valid, rng)
+        stolen = np.minimum(1, inf[rows, chosen])
+        res[mask, i] -= 1
+        inf[rows[mask], chosen[mask]] -= stolen[mask]
+        inf[mask, i] += stolen[mask]
+        resolved[mask] = chosen[mask]
+
+    mask = acting & (actions == NUKE)
+    if mask.any():
+        chosen = pick_targets(targets, nuke_valid, rng)
+        res[mask, i] -= games.nuke_cost
+        alive[rows[mask], chosen[mask]] = False
+        resolved[mask] = chosen[mask]
+
+    return acting, actions, resolved, contributions
+
+def finish(games, mask, ending):
+    """Record an ending for the games in mask"""
+    games.done |= mask
+    games.ending[mask] = ending
+    games.turns[mask] = min(games.turn, games.max_turns)
+
+def play_games(games, lineup, rng, log=None):
+    """Run every game to completion; lineup holds one vectorized policy per seat"""
+    K, n = games.K, games.n
+    rows = np.arange(K)
+
+    while games.turn <= games.max_turns and not games.done.all():
+        games.seats = games.available_seats()
+        alive_count = games.alive.sum(axis=1)
+
+        launch = ~games.done & (alive_count <= games.seats)
+        games.winners[launch] = games.alive[launch]
+        finish(games, launch & (alive_count > 0), 1)
+        finish(games, launch & (alive_count == 0), 2)
+
+        # Phase 1: seats act in order
+        round_contrib = np.zeros((K, n), dtype=np.int32)
+        acted = np.zeros((K, n), dtype=bool)
+        for i in range(n):
+            raw_actions, raw_targets, raw_contributions = lineup[i](games, i, rng)
+            acting, actions, resolved, contributions = step_seat(
+                games, i, raw_actions.copy(), raw_targets.copy(), raw_contributions.copy(), rng
+            )
+            round_contrib[acting, i] = contributions[acting]
+            acted[:, i] = acting
+            if log is not None:
+                log["action"][games.turn - 1, i] = np.where(acting, raw_actions, -1)
+                log["contribution"][games.turn - 1, i] = raw_contributions
+                log["target"][games.turn - 1, i] = resolved
+
+        # Phase 2: agents still alive pay what they pledged
+        live = ~games.done
+        paid = np.where(games.alive & live[:, None], round_contrib, 0)
+        games.resources -= paid
+        games.project += paid.sum(axis=1, dtype=np.int32)
+
+        # Leader: unique top pledge among agents that acted, even if since eliminated
+        pledged = np.where(acted, round_contrib, 0)
+        top = pledged.max(axis=1)
+        top_count = (pledged == top[:, None]).sum(axis=1)
+        has_leader = live & (top > 0) & (top_count == 1)
+        leader = np.argmax(pledged, axis=1)
+        games.leader[has_leader] = leader[has_leader]
+        games.influence[rows[has_leader], leader[has_leader]] += 1
+
+        games.update_threats()
+        games.seats = np.where(live, games.available_seats(), games.seats)
+        games.turn += 1
+
+    # Time limit: highest influence boards, earlier seats win ties
+    remaining = ~games.done
+    if remaining.any():
+        ranked_influence = np.where(games.alive, games.influence, np.iinfo(np.int32).min)
+        order = np.argsort(-ranked_influence.astype(np.int64), axis=1, kind="stable")
+        rank = np.empty_like(order)
+        rank[rows[:, None], order] = np.arange(n)[None, :]
+        winners = games.alive & (rank < games.seats[:, None])
+        games.winners[remaining] = winners[remaining]
+        games.done |= remaining
+        games.ending[remaining] = 3
+        games.turns[remaining] = games.max_turns
+
+# ------------------- Vectorized Policies -------------------
+
+def random_policy(games, i, rng):
+    """Uniform action, no target, uniform contribution in [0, resources]"""
+    actions = rng.integers(0, len(ACTIONS), games.K)
+    contributions = np.floor(rng.random(games.K) * (np.maximum(games.resources[:, i], 0) + 1)).astype(np.int32)
+    return actions, np.full(games.K, -1), contributions
+
+def producer_policy(games, i, rng):
+    """Always Produce and keep everything"""
+    return np.full(games.K, PRODUCE), np.full(games.K, -1), np.zeros(games.K, dtype=np.int32)
+
+def contributor_policy(games, i, rng):
+    """Produce and pour everything into the PROJECT"""
+    return np.full(games.K, PRODUCE), np.full(games.K, -1), games.resources[:, i].copy()
+
+def aggressor_policy(games, i, rng):
+    """Nuke the biggest threat when affordable, else Invade it, else build"""
+    threat = games.threat[:, i]
+    build = np.where(rng.random(games.K) < 0.5, PRODUCE, INFLUENCE)
+    actions = np.where(
+        games.resources[:, i] >= games.nuke_cost, NUKE,
+        np.where(games.influence[:, i] >= 1, INVADE, build)
+    )
+    targets = np.where((actions == NUKE) | (actions == INVADE), threat, -1)
+    return actions, targets, np.zeros(games.K, dtype=np.int32)
+
+VEC_POLICIES = {
+    "random": random_policy,
+    "producer": producer_policy,
+    "contributor": contributor_policy,
+    "aggressor": aggressor_policy
+}
+
+# ------------------- Batch Runner -------------------
+
+def run_batch(num_games, lineup, max_turns=15, nuke_cost=8, seats_thresholds=SEATS_THRESHOLDS, seed=None):
+    """Simulate num_games in lockstep and return summarize()-style aggregate stats"""
+    unknown = [policy for policy in lineup if policy not in VEC_POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies: {', '.join(unknown)}")
+
+    seed = seed if seed is not None else random.randrange(2 ** 32)
+    rng = np.random.default_rng(seed)
+    games = VecGames(num_games, len(lineup), max_turns, nuke_cost, seats_thresholds)
+
+    started = time.time()
+    play_games(games, [VEC_POLICIES[policy] for policy in lineup], rng)
+    elapsed = time.time() - started
+
+    stats = new_stats()
+    stats["games"] = num_games
+    stats["turns"] = int(games.turns.sum())
+    stats["project_total"] = int(games.project.sum())
+    stats["survivors"] = int(games.alive.sum())
+    for code, count in zip(*np.unique(games.ending, return_counts=True)):
+        stats["endings"][ENDING_NAMES[int(code)]] += int(count)
+    seat_wins = games.winners.sum(axis=0)
+    for seat, policy in enumerate(lineup):
+        stats["seats_played"][policy] += num_games
+        stats["wins"][policy] += int(seat_wins[seat])
+        stats["seat_wins"][seat] += int(seat_wins[seat])
+    return summarize(stats, elapsed, seed)
+
+# ------------------- Differential Check -------------------
+
+def differential_check(num_games=2000, lineup=("random", "aggressor", "contributor", "random", "producer"), seed=0):
+    """Replay vectorized decisions through engine.play_game and report any game that diverges"""
+    rng = np.random.default_rng(seed)
+    n = len(lineup)
+    games = VecGames(num_games, n)
+    shape = (games.max_turns, n, num_games)
+    log = {
+        "action": np.full(shape, -1, dtype=np.int64),
+        "target": np.full(shape, -1, dtype=np.int64),
+        "contribution": np.zeros(shape, dtype=np.int64)
+    }
+    play_games(games, [VEC_POLICIES[policy] for policy in lineup], rng, log)
+
+    names = [f"Agent{i + 1}" for i in range(n)]
+    endings = {name: code for code, name in ENDING_NAMES.items()}
+    mismatches = []
+    for k in range(num_games):
+        final = {}
+
+        def scripted(name, state, memory, _rng, k=k):
+            final["state"] = state
+            t, i = state.turn - 1, state.ids[name]
+            target = int(log["target"][t, i, k])
+            return {
+                "action": ACTIONS[int(log["action"][t, i, k])],
+                "target": names[target] if target >= 0 else None,
+                "contribution": int(log["contribution"][t, i, k])
+            }
+
+        result = play_game(names, {name: scripted for name in names}, rng=random.Random(k))
+        state = final["state"]
+        expected_winners = {names[i] for i in np.flatnonzero(games.winners[k])}
+        same = (
+            list(state.resources) == games.resources[k].tolist()
+            and list(state.influence) == games.influence[k].tolist()
+            and [bool(a) for a in state.alive] == games.alive[k].tolist()
+            and state.project_total == int(games.project[k])
+            and (names.index(state.project_leader) if state.project_leader else -1) == int(games.leader[k])
+            and set(result["winners"]) == expected_winners
+            and endings[result["ending"]] == int(games.ending[k])
+            and result["turns"] == int(games.turns[k])
+        )
+        if not same:
+            mismatches.append(k)
+    return {"games": num_games, "mismatches": len(mismatches), "first_mismatches": mismatches[:10]}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Vectorized lockstep simulator for balance tuning")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--lineup", default="random,producer,contributor,aggressor",
+                        help=f"comma-separated policies in seat order ({', '.join(VEC_POLICIES)})")
+    parser.add_argument("--max-turns", type=int, default=15)
+    parser.add_argument("--nuke-cost", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--check", action="store_true", help="verify against the scalar engine instead")
+    args = parser.parse_args()
+
+    lineup = [policy.strip() for policy in args.lineup.split(",") if policy.strip()]
+    if args.check:
+        print(json.dumps(differential_check(min(args.games, 5000), lineup, args.seed or 0), indent=2))
+    else:
+        print(json.dumps(run_batch(args.games, lineup, args.max_turns, args.nuke_cost, seed=args.seed), indent=2))